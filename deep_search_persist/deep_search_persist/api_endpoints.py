@@ -1,5 +1,4 @@
 import asyncio  # Added for async operations
-import copy
 import datetime
 import json  # Added for SSE
 from typing import Any, Dict, cast
@@ -56,7 +55,8 @@ async def health_check():
 
 # --- Transformer to handle both OpenAI-style (list) and server Messages ---
 def transform_chat_completion_request(raw_body: dict[str, Any]) -> ChatCompletionRequest:
-    body = copy.deepcopy(raw_body)
+    # Only top-level keys are replaced below, so a shallow copy keeps raw_body intact
+    body = dict(raw_body)
     messages = body.get("messages")
     # If messages is a list of dicts, convert to Messages
     if isinstance(messages, list):
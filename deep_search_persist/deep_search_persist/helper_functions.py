@@ -14,6 +14,9 @@ from .configuration import app_config
 from .helper_classes import Message, Messages
 from .local_ai import call_ollama_async, fetch_webpage_text_async, call_llm_async, call_llm_async_parse_list
 
+# Matches <think>...</think> reasoning blocks emitted by reasoning models
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
 
 @log_operation("make_initial_searching_plan", level="DEBUG")
 async def make_initial_searching_plan_async(session: aiohttp.ClientSession, helper_messages: Messages) -> Optional[str]:
@@ -58,7 +61,7 @@ async def make_initial_searching_plan_async(session: aiohttp.ClientSession, help
     if response:
         try:
             # Remove <think>...</think> tags and their content if they exist
-            cleaned_response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL).strip()
+            cleaned_response = _THINK_RE.sub("", response).strip()
             logger.debug("Generated research plan", plan_length=len(cleaned_response))
             return cleaned_response
         except Exception as e:
@@ -112,7 +115,7 @@ async def judge_search_result_and_future_plan_async(
     if response:
         try:
             # Remove <think>...</think> tags and their content if they exist
-            cleaned_response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL).strip()
+            cleaned_response = _THINK_RE.sub("", response).strip()
             logger.debug("Generated next research plan", plan_length=len(cleaned_response))
             return cleaned_response
         except Exception as e:
@@ -165,7 +168,7 @@ async def generate_writing_plan_async(
     if response:
         try:
             # Remove <think>...</think> tags and their content if they exist
-            cleaned_response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL).strip()
+            cleaned_response = _THINK_RE.sub("", response).strip()
             logger.debug("Generated writing plan", plan_length=len(cleaned_response))
             return cleaned_response
         except Exception as e:
@@ -605,7 +608,7 @@ async def judge_search_result_and_refine_plan_async(  # Renamed to avoid redefin
         response_content = "".join(response_parts) if response_parts else None
 
         if response_content:
-            cleaned_response = re.sub(r"<think>.*?</think>", "", response_content, flags=re.DOTALL).strip()
+            cleaned_response = _THINK_RE.sub("", response_content).strip()
         return cleaned_response
     except Exception as e:
         logger.exception("Error processing response in judge_search_result_and_refine_plan_async", error=str(e))
@@ -240,7 +240,8 @@ async def call_openrouter_async(
     global openrouter_last_request_times
     # Apply rate limiting only for DEFAULT_MODEL and when REQUEST_PER_MINUTE is set
     if model == app_config.default_model and app_config.request_per_minute > 0:
-        current_time = time.time()
+        # Use the event loop clock so the window follows the same time source as anyio.sleep
+        current_time = anyio.current_time()
         # Remove requests older than 60 seconds
         openrouter_last_request_times = [t for t in openrouter_last_request_times if current_time - t < 60]
 
@@ -32,7 +32,7 @@ import sys
 from datetime import datetime
 from functools import wraps  # type: ignore
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Optional, TypeVar, Union, cast
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar, Union, cast
 
 if sys.version_info >= (3, 10):
     from typing import ParamSpec, overload
@@ -228,7 +228,27 @@ def log_operation(operation_name: str, level: str = "INFO"):
                 logger.exception(f"Error in async {operation_name}: {str(e)}", **context)
                 raise
 
-        # Return appropriate wrapper based on if the function is a coroutine
+        @wraps(func)
+        async def async_gen_wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[Any]:
+            # Extract context info from kwargs if available
+            log_context_value = kwargs.pop("log_context", None)
+            context: dict[str, Any] = log_context_value if isinstance(log_context_value, dict) else {}
+            log_func = getattr(logger, level.lower())
+
+            log_func(f"Starting async {operation_name}", **context)
+            try:
+                # Async generators must be re-yielded from, not awaited
+                typed_gen_func = cast(Callable[P, AsyncIterator[Any]], func)
+                async for item in typed_gen_func(*args, **kwargs):
+                    yield item
+                log_func(f"Completed async {operation_name}", **context)
+            except Exception as e:
+                logger.exception(f"Error in async {operation_name}: {str(e)}", **context)
+                raise
+
+        # Return appropriate wrapper based on the kind of function being decorated
+        if inspect.isasyncgenfunction(func):
+            return async_gen_wrapper
         if is_coroutine_function(func):
             return async_wrapper
         return wrapper
@@ -16,7 +16,6 @@ from bson import ObjectId
 from loguru import logger
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pydantic import BaseModel, Extra
-from typing_extensions import Self
 
 from ..logging.logging_config import AsyncLogContext, LogContext
 from ..persistence.utils import DatetimeException, clean_dict, from_iso, to_iso
@@ -66,13 +65,6 @@ class SessionSummaryList(BaseModel):
     def __getattribute__(self, name: str) -> Any:
         return super().__getattribute__(name)
 
-    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> Self:
-        import copy
-        return copy.deepcopy(self, memo)
-
-    def __copy__(self) -> Self:
-        return self.__deepcopy__()
-
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, SessionSummaryList):
             return False
@@ -7,9 +7,29 @@ from bson import ObjectId
 from loguru import logger
 from pydantic import BaseModel, Field, ConfigDict
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
 from .helper_classes import Messages
 
 
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize session data to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Dict[str, Any]:
+    """Parse session JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class ResearchSession(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -73,8 +93,8 @@ class ResearchSession(BaseModel):
         # TODO: Remove this method in the next major release
         try:
             filepath.parent.mkdir(parents=True, exist_ok=True)
-            with open(filepath, "w") as f:
-                json.dump(self.to_dict(), f, indent=2)
+            with open(filepath, "wb") as f:
+                f.write(_dumps(self.to_dict()))
         except Exception as e:
             logger.error(f"Error saving session {self.session_id} to {filepath}: {e}")
 
@@ -88,8 +108,8 @@ class ResearchSession(BaseModel):
         if not filepath.exists():
             return None
         try:
-            with open(filepath, "r") as f:
-                data = json.load(f)
+            with open(filepath, "rb") as f:
+                data = _loads(f.read())
 
             # Recreate the session object from loaded data
             session = cls(
@@ -0,0 +1,84 @@
+"""
+Numba kernels for palette generation and distance calculations.
+
+Importing this module pulls in Numba, which is slow to import, so callers
+should only import it lazily when a palette is large enough to benefit.
+"""
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit("f8[:](f8[:, ::1])", fastmath=True, cache=True, parallel=True)
+def pairwise_ucs(coords):
+    """Condensed (i < j) vector of Euclidean distances between rows of an ``(N, 3)`` UCS array."""
+    n = coords.shape[0]
+    out = np.empty(n * (n - 1) // 2, dtype=np.float64)
+    for i in prange(n):
+        # Start of row i in the condensed vector, shifted so that out[base + j] is pair (i, j)
+        base = i * (2 * n - i - 1) // 2 - i - 1
+        for j in range(i + 1, n):
+            acc = 0.0
+            for k in range(3):
+                d = coords[i, k] - coords[j, k]
+                acc += d * d
+            out[base + j] = math.sqrt(acc)
+    return out
+
+
+def pairwise_ucs_distances(coords: np.ndarray) -> np.ndarray:
+    """Pairwise UCS distances in ``np.triu_indices(N, k=1)`` order."""
+    return pairwise_ucs(np.ascontiguousarray(coords, dtype=np.float64))
+
+
+@njit(cache=True)
+def _hue_to_rgb(p, q, t):
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1 / 6:
+        return p + (q - p) * 6 * t
+    if t < 1 / 2:
+        return q
+    if t < 2 / 3:
+        return p + (q - p) * (2 / 3 - t) * 6
+    return p
+
+
+@njit(cache=True)
+def build_palette(base_h, base_s, base_l, count, sequential, golden_angle):
+    """
+    Compute a qualitative (golden-angle) or sequential (lightness ramp) palette
+    as a ``uint8[count, 3]`` RGB array.
+    """
+    out = np.empty((count, 3), dtype=np.uint8)
+    base_saturation = max(0.4, min(0.8, base_s))
+    for i in range(count):
+        if sequential:
+            h = base_h
+            lx = 0.85 - (i / (count - 1)) * (0.85 - 0.15)
+            s = max(0.2, min(0.9, base_saturation + (1 - lx) * 0.1))
+        elif i == 0:
+            h, s, lx = base_h, base_s, base_l
+        else:
+            h = (base_h + (i * golden_angle) % 360) % 360
+            s = max(0.3, min(0.9, base_s + 0.1 * (i % 3 - 1)))
+            lx = max(0.3, min(0.7, base_l + 0.1 * ((i // 3) % 3 - 1)))
+
+        h = (h % 360) / 360.0
+        if s == 0:
+            r = g = b = lx
+        else:
+            q = lx * (1 + s) if lx < 0.5 else lx + s - lx * s
+            p = 2 * lx - q
+            r = _hue_to_rgb(p, q, h + 1 / 3)
+            g = _hue_to_rgb(p, q, h)
+            b = _hue_to_rgb(p, q, h - 1 / 3)
+
+        out[i, 0] = max(0.0, min(255.0, np.rint(r * 255)))
+        out[i, 1] = max(0.0, min(255.0, np.rint(g * 255)))
+        out[i, 2] = max(0.0, min(255.0, np.rint(b * 255)))
+    return out
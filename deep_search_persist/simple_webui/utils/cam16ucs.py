@@ -12,6 +12,8 @@ import math
 from typing import Tuple, List
 from dataclasses import dataclass
 
+import numpy as np
+
 # Import centralized logger from deep_search_persist
 from deep_search_persist.deep_search_persist.logging.logging_config import logger
 
@@ -241,6 +243,32 @@ def cam16_to_ucs(jch: Tuple[float, float, float]) -> Tuple[float, float, float]:
     return (j_prime, a_prime, b_prime)
 
 
+def cam16_to_ucs_batch(jch: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of CAM16 JCh rows to CAM16-UCS coordinates.
+
+    Vectorized form of cam16_to_ucs.
+
+    Args:
+        jch: Array of shape (N, 3) with columns J, C, h
+
+    Returns:
+        Array of shape (N, 3) with columns J', a', b'
+    """
+    jch = np.asarray(jch, dtype=np.float64).reshape(-1, 3)
+    j, c, h = jch[:, 0], jch[:, 1], jch[:, 2]
+
+    j_prime = (1.7 * j) / (1.0 + 0.007 * j)
+    m_prime = (1.0 / 0.0228) * np.log(1.0 + 0.0228 * c)
+
+    h_rad = np.radians(h)
+    ucs = np.empty_like(jch)
+    ucs[:, 0] = j_prime
+    ucs[:, 1] = m_prime * np.cos(h_rad)
+    ucs[:, 2] = m_prime * np.sin(h_rad)
+    return ucs
+
+
 def ucs_to_cam16(ucs: Tuple[float, float, float]) -> Tuple[float, float, float]:
     """
     Convert CAM16-UCS coordinates to CAM16 JCh.
@@ -1,4 +1,12 @@
 # Color space conversion utilities
+from functools import lru_cache
+
+# Every two-digit hex pair (any letter case) mapped to its channel value
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+_HEX_PAIR_TO_INT = {a + b: int(a + b, 16) for a in _HEX_DIGITS for b in _HEX_DIGITS}
+
+
+@lru_cache(maxsize=4096)
 def hex_to_rgb(hex_color):
     """Convert hex color to RGB tuple."""
     hex_color = hex_color.lstrip("#")
@@ -6,17 +14,22 @@ def hex_to_rgb(hex_color):
         raise ValueError(f"Invalid hex color: {hex_color}")
 
     try:
-        return tuple(int(hex_color[i: i + 2], 16) for i in (0, 2, 4))
-    except ValueError:
+        return (
+            _HEX_PAIR_TO_INT[hex_color[0:2]],
+            _HEX_PAIR_TO_INT[hex_color[2:4]],
+            _HEX_PAIR_TO_INT[hex_color[4:6]],
+        )
+    except KeyError:
         raise ValueError(f"Invalid hex color: {hex_color}")
 
 
 def rgb_to_hex(rgb):
     """Convert RGB tuple to hex string."""
     r, g, b = [max(0, min(255, int(x))) for x in rgb]
-    return f"#{r:02x}{g:02x}{b:02x}"
+    return "#" + bytes((r, g, b)).hex()
 
 
+@lru_cache(maxsize=4096)
 def rgb_to_hsl(r, g, b):
     """
     Convert RGB values to HSL (Hue, Saturation, Lightness).
@@ -76,17 +89,6 @@ def hsl_to_rgb(h, s, lx):
     # Normalize hue to 0-1
     h = (h % 360) / 360.0
 
-    def hue_to_rgb(p, q, t):
-        if t < 0:
-            t += 1
-        if t > 1:
-            t -= 1
-        if t < 1 / 6:
-            return p + (q - p) * 6 * t
-        if t < 1 / 2:
-            return q
-        return p + (q - p) * (2 / 3 - t) * 6 if t < 2 / 3 else p
-
     if s == 0:
         # Achromatic
         r = g = b = lx
@@ -94,14 +96,59 @@ def hsl_to_rgb(h, s, lx):
         q = lx * (1 + s) if lx < 0.5 else lx + s - lx * s
         p = 2 * lx - q
 
-        r = hue_to_rgb(p, q, h + 1 / 3)
-        g = hue_to_rgb(p, q, h)
-        b = hue_to_rgb(p, q, h - 1 / 3)
+        r = _hue_to_rgb(p, q, h + 1 / 3)
+        g = _hue_to_rgb(p, q, h)
+        b = _hue_to_rgb(p, q, h - 1 / 3)
 
     # Convert to 0-255 range
     return (int(round(r * 255)), int(round(g * 255)), int(round(b * 255)))
 
 
+def hsl_to_hex(h, s, lx):
+    """
+    Convert HSL values directly to a hex string.
+
+    Equivalent to ``rgb_to_hex(hsl_to_rgb(h, s, lx))`` without building the
+    intermediate RGB tuple.
+
+    Args:
+        h: Hue in degrees (0-360)
+        s: Saturation (0-1)
+        l: Lightness (0-1)
+
+    Returns:
+        Hex color string
+    """
+    h = (h % 360) / 360.0
+
+    if s == 0:
+        r = g = b = lx
+    else:
+        q = lx * (1 + s) if lx < 0.5 else lx + s - lx * s
+        p = 2 * lx - q
+
+        r = _hue_to_rgb(p, q, h + 1 / 3)
+        g = _hue_to_rgb(p, q, h)
+        b = _hue_to_rgb(p, q, h - 1 / 3)
+
+    r = max(0, min(255, int(round(r * 255))))
+    g = max(0, min(255, int(round(g * 255))))
+    b = max(0, min(255, int(round(b * 255))))
+    return "#" + bytes((r, g, b)).hex()
+
+
+def _hue_to_rgb(p, q, t):
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1 / 6:
+        return p + (q - p) * 6 * t
+    if t < 1 / 2:
+        return q
+    return p + (q - p) * (2 / 3 - t) * 6 if t < 2 / 3 else p
+
+
 def rgb_to_linear(rgb_component):
     """Convert sRGB component to linear RGB for luminance calculation."""
     # Normalize to 0-1 range
@@ -6,10 +6,34 @@ Implements qualitative, sequential, and diverging color palettes
 with accessibility considerations and color blindness support.
 """
 
+from functools import lru_cache
 from typing import Any
-from .color_convert import hex_to_rgb, rgb_to_hex, rgb_to_hsl, hsl_to_rgb
+from .color_convert import hex_to_rgb, rgb_to_hsl, hsl_to_hex
 from .hue_spacing_calculator import generate_accessible_palette
 
+# Golden-angle hue offsets are the same for every palette; only the base hue shifts.
+GOLDEN_ANGLE = 137.5
+_GOLDEN_HUES = tuple((i * GOLDEN_ANGLE) % 360 for i in range(32))
+
+# Palettes at least this long are built by the compiled kernel when Numba is available
+NUMBA_MIN_COUNT = 64
+
+
+@lru_cache(maxsize=None)
+def _load_palette_kernel():
+    """Import the Numba palette kernel on first use; None if Numba is not installed."""
+    try:
+        from ._palette_numba import build_palette
+    except ImportError:
+        return None
+    return build_palette
+
+
+def _rgb_array_to_hex(rgb) -> list[str]:
+    """Format an ``(n, 3)`` uint8 RGB array as hex strings."""
+    digits = rgb.tobytes().hex()
+    return ["#" + digits[i : i + 6] for i in range(0, len(digits), 6)]
+
 
 # Core Color Theory Implementation
 class ColorPalette:
@@ -20,6 +44,15 @@ class ColorPalette:
         self.description = description
         self.base_hue = base_hue
         self.accessibility_rating = accessibility_rating
+        self._base_hsl = self._parse_base()
+
+    def _parse_base(self):
+        """Parse the base hex color to HSL once, falling back to a neutral base if invalid."""
+        try:
+            base_r, base_g, base_b = hex_to_rgb(self.base_hue)
+            return rgb_to_hsl(base_r, base_g, base_b)
+        except ValueError:
+            return 200, 0.6, 0.5
 
     def generate_qualitative_colors(self, count=6):
         """
@@ -37,13 +70,8 @@ class ColorPalette:
         if count <= 0:
             return []
 
-        # Parse base hue
-        try:
-            base_r, base_g, base_b = hex_to_rgb(self.base_hue)
-            base_h, base_s, base_l = rgb_to_hsl(base_r, base_g, base_b)
-        except ValueError:
-            # Fallback to a neutral base
-            base_h, base_s, base_l = 200, 0.6, 0.5
+        base_h, base_s, base_l = self._base_hsl
+        build_palette = _load_palette_kernel() if count >= NUMBA_MIN_COUNT else None
 
         colors = []
 
@@ -54,11 +82,16 @@ class ColorPalette:
             if count == 2:
                 # Add complementary color
                 comp_h = (base_h + 180) % 360
-                comp_color = hsl_to_rgb(comp_h, base_s, base_l)
-                colors.append(rgb_to_hex(comp_color))
+                colors.append(hsl_to_hex(comp_h, base_s, base_l))
+        elif build_palette is not None:
+            rgb = build_palette(float(base_h), float(base_s), float(base_l), count, False, GOLDEN_ANGLE)
+            colors = _rgb_array_to_hex(rgb)
         else:
             # Use golden angle for optimal perceptual distribution
-            golden_angle = 137.5
+            if count <= len(_GOLDEN_HUES):
+                golden_hues = _GOLDEN_HUES
+            else:
+                golden_hues = tuple((i * GOLDEN_ANGLE) % 360 for i in range(count))
 
             for i in range(count):
                 if i == 0:
@@ -68,7 +101,7 @@ class ColorPalette:
                     lx = base_l
                 else:
                     # Distribute hues using golden angle for better perception
-                    h = (base_h + i * golden_angle) % 360
+                    h = (base_h + golden_hues[i]) % 360
 
                     # Vary saturation and lightness for additional distinction
                     s = base_s + (0.1 * (i % 3 - 1))  # Slight saturation variation
@@ -78,8 +111,7 @@ class ColorPalette:
                     s = max(0.3, min(0.9, s))
                     lx = max(0.3, min(0.7, lx))
 
-                rgb = hsl_to_rgb(h, s, lx)
-                colors.append(rgb_to_hex(rgb))
+                colors.append(hsl_to_hex(h, s, lx))
 
         return colors[:count]
 
@@ -99,18 +131,18 @@ class ColorPalette:
         if steps <= 0:
             return []
 
-        try:
-            base_r, base_g, base_b = hex_to_rgb(self.base_hue)
-            base_h, base_s, base_l = rgb_to_hsl(base_r, base_g, base_b)
-        except ValueError:
-            # Fallback to a neutral progression
-            base_h, base_s, base_l = 200, 0.6, 0.5
+        base_h, base_s, base_l = self._base_hsl
 
         colors = []
 
         if steps == 1:
             return [self.base_hue]
 
+        build_palette = _load_palette_kernel() if steps >= NUMBA_MIN_COUNT else None
+        if build_palette is not None:
+            rgb = build_palette(float(base_h), float(base_s), float(base_l), steps, True, GOLDEN_ANGLE)
+            return _rgb_array_to_hex(rgb)
+
         # Define lightness range for good contrast and readability
         min_lightness = 0.15  # Dark enough for contrast
         max_lightness = 0.85  # Light enough to distinguish from white
@@ -131,8 +163,7 @@ class ColorPalette:
             saturation = base_saturation + (1 - lightness) * 0.1
             saturation = max(0.2, min(0.9, saturation))
 
-            rgb = hsl_to_rgb(base_h, saturation, lightness)
-            colors.append(rgb_to_hex(rgb))
+            colors.append(hsl_to_hex(base_h, saturation, lightness))
 
         return colors
 
@@ -314,6 +345,11 @@ COLOR_SCHEMES: dict[str, Any] = {
     },
 }
 
+_DEFAULT_SCHEME = COLOR_SCHEMES["Warm Earth"]
+
+# Dropdown labels never change after import, so build them once.
+SCHEME_CHOICES = tuple(f"{name} - {scheme['description']}" for name, scheme in COLOR_SCHEMES.items())
+
 
 def generate_perceptual_palette(base_hue: str, count: int, min_step: float = 25.0) -> list[str]:
     """
@@ -332,15 +368,12 @@ def generate_perceptual_palette(base_hue: str, count: int, min_step: float = 25.
 
 def get_color_scheme(scheme_name="Warm Earth"):
     """Get a color scheme with fallback to default."""
-    return COLOR_SCHEMES.get(scheme_name, COLOR_SCHEMES["Warm Earth"])
+    return COLOR_SCHEMES.get(scheme_name, _DEFAULT_SCHEME)
 
 
 def create_scheme_choices():
     """Create dropdown choices with descriptive labels."""
-    choices = []
-    for name, scheme in COLOR_SCHEMES.items():
-        choices.append(f"{name} - {scheme['description']}")
-    return choices
+    return SCHEME_CHOICES
 
 
 def get_scheme_description(scheme_name):
@@ -384,68 +417,68 @@ def generate_css_variables(scheme_name="Warm Earth"):
     return css_vars
 
 
-def create_complete_css(scheme_name="Warm Earth"):
-    """Generate complete CSS for the UI with the selected color scheme."""
-    scheme = get_color_scheme(scheme_name)
-
-    css = f"""
+# Scheme-independent parts of the stylesheet. Only the header is formatted per
+# call; the rest is a plain string so braces need no escaping.
+_CSS_HEADER = """
 /* Color Scheme: {scheme_name} */
-/* {scheme['description']} */
+/* {description} */
 
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
 
-{generate_css_variables(scheme_name)}
+"""
+
+_STATIC_CSS = """
 
 /* Global Styles */
-* {{
+* {
     box-sizing: border-box;
-}}
+}
 
-.gradio-container {{
+.gradio-container {
     background: var(--color-background) !important;
     color: var(--color-text-primary) !important;
     font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif !important;
     transition: all 0.2s ease-in-out;
-}}
+}
 
 /* Header Styling */
-.header-container {{
+.header-container {
     background: var(--gradient-primary) !important;
     color: var(--color-text-inverse) !important;
     padding: 1.5rem !important;
     border-radius: 12px !important;
     margin-bottom: 1.5rem !important;
     box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1) !important;
-}}
+}
 
-.app-title {{
+.app-title {
     font-size: 1.875rem !important;
     font-weight: 700 !important;
     margin: 0 !important;
-}}
+}
 
-.app-subtitle {{
+.app-subtitle {
     font-size: 1rem !important;
     opacity: 0.9 !important;
     margin-top: 0.5rem !important;
-}}
+}
 
 /* Cards and Containers */
-.settings-card, .output-card {{
+.settings-card, .output-card {
     background: var(--color-surface) !important;
     border: 2px solid var(--color-border) !important;
     border-radius: 12px !important;
     padding: 1.5rem !important;
     box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1) !important;
     transition: border-color 0.2s ease-in-out !important;
-}}
+}
 
-.settings-card:hover, .output-card:hover {{
+.settings-card:hover, .output-card:hover {
     border-color: var(--color-border-focus) !important;
-}}
+}
 
 /* Button Styling */
-button {{
+button {
     background: var(--color-secondary) !important;
     color: var(--color-text-inverse) !important;
     border: none !important;
@@ -453,78 +486,78 @@ button {{
     font-weight: 500 !important;
     transition: all 0.2s ease-in-out !important;
     box-shadow: 0 1px 2px 0 rgba(0, 0, 0, 0.05) !important;
-}}
+}
 
-button:hover {{
+button:hover {
     background: var(--color-primary) !important;
     transform: translateY(-1px) !important;
     box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1) !important;
-}}
+}
 
-.start-button {{
+.start-button {
     background: var(--gradient-primary) !important;
     font-size: 1.125rem !important;
     padding: 0.75rem 1.5rem !important;
     font-weight: 600 !important;
-}}
+}
 
 /* Input Styling */
-.gr-textbox, .gr-dropdown, input, textarea, select {{
+.gr-textbox, .gr-dropdown, input, textarea, select {
     border: 2px solid var(--color-border) !important;
     border-radius: 8px !important;
     background: var(--color-surface) !important;
     color: var(--color-text-primary) !important;
     transition: all 0.2s ease-in-out !important;
-}}
+}
 
-.gr-textbox:focus, .gr-dropdown:focus, input:focus, textarea:focus, select:focus {{
+.gr-textbox:focus, .gr-dropdown:focus, input:focus, textarea:focus, select:focus {
     border-color: var(--color-border-focus) !important;
     box-shadow: 0 0 0 3px rgba(var(--color-primary), 0.1) !important;
     outline: none !important;
-}}
+}
 
 /* Output Areas */
-.thinking-output, .report-output {{
+.thinking-output, .report-output {
     background: var(--color-surface) !important;
     border: 2px solid var(--color-border) !important;
     border-radius: 8px !important;
     color: var(--color-text-primary) !important;
     font-family: 'Inter', monospace !important;
     line-height: 1.6 !important;
-}}
+}
 
 /* Status Indicators */
-.status-text {{
+.status-text {
     background: var(--color-surface-dark) !important;
     border: 1px solid var(--color-border) !important;
     border-radius: 6px !important;
     padding: 0.75rem !important;
-}}
+}
 
 /* Tab Styling */
-.main-tabs .tab-nav {{
+.main-tabs .tab-nav {
     background: var(--color-surface) !important;
     border-bottom: 2px solid var(--color-border) !important;
-}}
+}
 
-.main-tabs .tab-nav button {{
+.main-tabs .tab-nav button {
     background: transparent !important;
     color: var(--color-text-secondary) !important;
     border: none !important;
     border-bottom: 3px solid transparent !important;
-}}
+}
 
-.main-tabs .tab-nav button.selected {{
+.main-tabs .tab-nav button.selected {
     color: var(--color-primary) !important;
     border-bottom-color: var(--color-primary) !important;
-}}
+}
 
 /* Color Scheme Dropdown */
-.color-scheme-dropdown {{
+.color-scheme-dropdown {
     min-width: 200px !important;
-}}
+}
 
-.scheme-description {{
+.scheme-description {
     background: var(--color-accent) !important;
     padding: 0.75rem !important;
     border-radius: 6px !important;
@@ -532,32 +565,43 @@ button:hover {{
     margin-top: 0.5rem !important;
     font-style: italic !important;
     color: var(--color-text-secondary) !important;
-}}
+}
 
 /* Accessibility Enhancements */
-@media (prefers-reduced-motion: reduce) {{
-    * {{
+@media (prefers-reduced-motion: reduce) {
+    * {
         transition: none !important;
         animation: none !important;
-    }}
-}}
+    }
+}
 
 /* Focus indicators for keyboard navigation */
-*:focus {{
+*:focus {
     outline: 2px solid var(--color-primary) !important;
     outline-offset: 2px !important;
-}}
+}
 
 /* High contrast mode support */
-@media (prefers-contrast: high) {{
-    .settings-card, .output-card {{
+@media (prefers-contrast: high) {
+    .settings-card, .output-card {
         border-width: 3px !important;
-    }}
+    }
     
-    button {{
+    button {
         border: 2px solid var(--color-text-inverse) !important;
-    }}
-}}
+    }
+}
 """
 
+
+def create_complete_css(scheme_name="Warm Earth"):
+    """Generate complete CSS for the UI with the selected color scheme."""
+    scheme = get_color_scheme(scheme_name)
+
+    css = (
+        _CSS_HEADER.format(scheme_name=scheme_name, description=scheme["description"])
+        + generate_css_variables(scheme_name)
+        + _STATIC_CSS
+    )
+
     return css
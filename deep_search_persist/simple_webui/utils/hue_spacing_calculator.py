@@ -3,13 +3,106 @@ Hue Spacing Calculator for Accessibility-Optimized Color Generation
 Provides utilities for calculating perceptually uniform hue distributions using CAM16-UCS.
 """
 
-from typing import List, Dict, Any
-from .cam16ucs import optimize_hue_spacing, cam16_to_ucs, calculate_ucs_distance
-from .color_convert import hex_to_rgb, rgb_to_hex, rgb_to_hsl, hsl_to_rgb
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Literal, Tuple, Union
+
+import numpy as np
+
+from .cam16ucs import optimize_hue_spacing, cam16_to_ucs_batch
+from .color_convert import hex_to_rgb, rgb_to_hsl, hsl_to_hex
 
 # Import centralized logger from deep_search_persist
 from ...deep_search_persist.logging.logging_config import logger
 
+# Palettes with at least this many valid colors use the Numba pairwise kernel when available
+NUMBA_MIN_COUNT = 32
+
+
+@lru_cache(maxsize=None)
+def _load_pairwise_kernel():
+    """Import the Numba pairwise distance kernel on first use; None if Numba is not installed."""
+    try:
+        from ._palette_numba import pairwise_ucs_distances
+    except ImportError:
+        return None
+    return pairwise_ucs_distances
+
+
+@lru_cache(maxsize=4096)
+def _hex_to_hsl(color: str):
+    """Convert a hex color to HSL; cached since palettes reuse the same colors across calls."""
+    r, g, b = hex_to_rgb(color)
+    return rgb_to_hsl(r, g, b)
+
+
+@dataclass(frozen=True, slots=True)
+class PaletteView:
+    """
+    A palette converted to RGB, HSL and CAM16-UCS once, for reuse across analysis calls.
+
+    ``colors`` is the palette as given; ``hex`` lists the valid colors and each
+    array has one row per valid color in the same order.
+    """
+
+    colors: Tuple[str, ...]
+    hex: Tuple[str, ...]
+    rgb: np.ndarray
+    hsl: np.ndarray
+    ucs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+
+def prepare_palette(colors: List[str]) -> PaletteView:
+    """
+    Precompute the color data used by palette validation and optimization.
+
+    Pass the result to validate_palette_accessibility and optimize_existing_palette
+    to avoid converting the same colors twice.
+
+    Args:
+        colors: List of hex color strings
+
+    Returns:
+        PaletteView with invalid colors logged and left out of the arrays
+    """
+    # One contiguous (N, 3) buffer per color space, filled row by row
+    count = len(colors)
+    rgb = np.empty((count, 3), dtype=np.float64)
+    hsl = np.empty((count, 3), dtype=np.float64)
+    valid_colors = []
+
+    for color in colors:
+        try:
+            row_rgb = hex_to_rgb(color)
+            row_hsl = _hex_to_hsl(color)
+        except (ValueError, TypeError) as e:
+            # Log invalid colors for debugging; loguru formats the arguments only if the message is emitted
+            logger.warning("Skipping invalid color '{}': {}", color, e)
+            continue
+
+        row = len(valid_colors)
+        rgb[row] = row_rgb
+        hsl[row] = row_hsl
+        valid_colors.append(color)
+
+    valid_count = len(valid_colors)
+    hsl = hsl[:valid_count]
+
+    # Use actual lightness and chroma from each color, converted in one batch
+    jch = np.column_stack([hsl[:, 2] * 100, hsl[:, 1] * 100, hsl[:, 0]])
+
+    return PaletteView(
+        colors=tuple(colors),
+        hex=tuple(valid_colors),
+        rgb=rgb[:valid_count],
+        hsl=hsl,
+        ucs=cam16_to_ucs_batch(jch),
+    )
+
+
 def calculate_perceptual_hue_steps(base_hue: float, count: int,
                                    min_step: float = 25.0,
                                    lightness: float = 50.0,
@@ -56,7 +149,13 @@ def calculate_perceptual_hue_steps(base_hue: float, count: int,
     if count <= 1:
         return [base_hue]
 
-    return optimize_hue_spacing(base_hue, count, min_step)
+    return list(_optimized_hue_steps(base_hue, count, min_step))
+
+
+@lru_cache(maxsize=2048)
+def _optimized_hue_steps(base_hue: float, count: int, min_step: float) -> tuple:
+    """Memoized optimizer call; lightness and chroma do not affect the result so they are not part of the key."""
+    return tuple(optimize_hue_spacing(base_hue, count, min_step))
 
 
 def generate_accessible_palette(base_color: str, count: int,
@@ -79,8 +178,7 @@ def generate_accessible_palette(base_color: str, count: int,
 
     try:
         # Parse base color
-        r, g, b = hex_to_rgb(base_color)
-        h, s, lightness = rgb_to_hsl(r, g, b)
+        h, s, lightness = _hex_to_hsl(base_color)
 
         # Calculate optimal hue distribution
         target_lightness = lightness * 100  # Convert to 0-100 scale
@@ -90,21 +188,12 @@ def generate_accessible_palette(base_color: str, count: int,
             h, count, min_perceptual_distance, target_lightness, target_chroma
         )
 
-        # Generate colors with optimized hues
-        colors = []
-        for hue in hues:
-            if preserve_lightness:
-                # Keep original lightness and saturation for WCAG compliance
-                rgb_color = hsl_to_rgb(hue, s, lightness)
-            else:
-                # REMOVED: Automatic lightness variation contradicts WCAG contrast requirements
-                # Use original lightness to maintain accessibility compliance
-                logger.info("Using original lightness to maintain WCAG compliance")
-                rgb_color = hsl_to_rgb(hue, s, lightness)
+        if not preserve_lightness:
+            # REMOVED: Automatic lightness variation contradicts WCAG contrast requirements
+            logger.info("Using original lightness to maintain WCAG compliance")
 
-            colors.append(rgb_to_hex(rgb_color))
-
-        return colors
+        # Generate colors with optimized hues, keeping original lightness and saturation for WCAG compliance
+        return [hsl_to_hex(hue, s, lightness) for hue in hues]
 
     except (ValueError, TypeError) as e:
         # Structured logging for error handling
@@ -113,18 +202,28 @@ def generate_accessible_palette(base_color: str, count: int,
         return _fallback_palette_generation(base_color, count)
 
 
-def validate_palette_accessibility(colors: List[str],
-                                   min_distance: float = 20.0) -> Dict[str, Any]:
+def validate_palette_accessibility(colors: Union[List[str], PaletteView],
+                                   min_distance: float = 20.0,
+                                   mode: Literal["full", "valid_only", "min_only"] = "full") -> Dict[str, Any]:
     """
     Validate the accessibility of a color palette using perceptual distance metrics.
 
     Args:
-        colors: List of hex color strings
+        colors: List of hex color strings, or a PaletteView from prepare_palette
         min_distance: Minimum acceptable perceptual distance
+        mode: "full" for the complete report; "valid_only" returns just ``valid`` and
+            stops at the first pair closer than min_distance; "min_only" skips the
+            violations list and recommendations
 
     Returns:
         Dictionary with validation results and recommendations
+
+    Raises:
+        ValueError: If mode is not one of the supported values
     """
+    if mode not in ("full", "valid_only", "min_only"):
+        raise ValueError(f"Unknown validation mode: {mode}")
+
     if len(colors) < 2:
         return {
             "valid": True,
@@ -135,24 +234,10 @@ def validate_palette_accessibility(colors: List[str],
         }
 
     # Convert colors to CAM16-UCS for perceptual distance calculation
-    ucs_colors = []
-
-    for color in colors:
-        try:
-            r, g, b = hex_to_rgb(color)
-            h, s, lightness = rgb_to_hsl(r, g, b)
-
-            # Use actual lightness and chroma from color
-            jch = (lightness * 100, s * 100, h)
-            ucs = cam16_to_ucs(jch)
-            ucs_colors.append(ucs)
+    view = colors if isinstance(colors, PaletteView) else prepare_palette(colors)
+    valid_colors = view.hex
 
-        except (ValueError, TypeError) as e:
-            # Log invalid colors for debugging
-            logger.warning(f"Skipping invalid color '{color}': {str(e)}")
-            continue
-
-    if len(ucs_colors) < 2:
+    if len(valid_colors) < 2:
         return {
             "valid": False,
             "error": "Insufficient valid colors for analysis",
@@ -162,25 +247,46 @@ def validate_palette_accessibility(colors: List[str],
             "recommendations": ["Check color format validity"]
         }
 
-    # Calculate all pairwise distances
-    distances = []
-    violations = []
-
-    for i in range(len(ucs_colors)):
-        for j in range(i + 1, len(ucs_colors)):
-            distance = calculate_ucs_distance(ucs_colors[i], ucs_colors[j])
-            distances.append(distance)
-
-            if distance < min_distance:
-                violations.append({
-                    "color1": colors[i],
-                    "color2": colors[j],
-                    "distance": round(distance, 2),
-                    "required": min_distance
-                })
+    coords = view.ucs
+
+    if mode == "valid_only":
+        # Check one row of pairs at a time so the first violation ends the scan
+        for i in range(len(coords) - 1):
+            diff = coords[i + 1:] - coords[i]
+            if (np.sqrt(np.einsum("ij,ij->i", diff, diff)) < min_distance).any():
+                return {"valid": False}
+        return {"valid": True}
+
+    # Calculate all pairwise distances as a condensed (i < j) vector
+    pair_i, pair_j = np.triu_indices(len(coords), k=1)
+    pairwise_kernel = _load_pairwise_kernel() if len(coords) >= NUMBA_MIN_COUNT else None
+    if pairwise_kernel is not None:
+        distances = pairwise_kernel(coords)
+    else:
+        diff = coords[:, None, :] - coords[None, :, :]
+        distances = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))[pair_i, pair_j]
+
+    min_dist = float(distances.min())
+    avg_dist = float(distances.mean())
+
+    if mode == "min_only":
+        return {
+            "valid": min_dist >= min_distance,
+            "min_distance": round(min_dist, 2),
+            "avg_distance": round(avg_dist, 2),
+            "total_pairs": int(distances.size),
+        }
 
-    min_dist = min(distances) if distances else 0.0
-    avg_dist = sum(distances) / len(distances) if distances else 0.0
+    mask = distances < min_distance
+    violations = [
+        {
+            "color1": valid_colors[i],
+            "color2": valid_colors[j],
+            "distance": round(distance, 2),
+            "required": min_distance
+        }
+        for i, j, distance in zip(pair_i[mask].tolist(), pair_j[mask].tolist(), distances[mask].tolist())
+    ]
 
     # Generate recommendations
     recommendations = []
@@ -200,59 +306,55 @@ def validate_palette_accessibility(colors: List[str],
         "avg_distance": round(avg_dist, 2),
         "violations": violations,
         "recommendations": recommendations,
-        "total_pairs": len(distances),
+        "total_pairs": int(distances.size),
         "violation_count": len(violations)
     }
 
 
-def optimize_existing_palette(colors: List[str],
+def optimize_existing_palette(colors: Union[List[str], PaletteView],
                               target_distance: float = 25.0) -> List[str]:
     """
     Optimize an existing color palette for better perceptual spacing.
 
     Args:
-        colors: List of hex color strings to optimize
+        colors: List of hex color strings to optimize, or a PaletteView from prepare_palette
         target_distance: Target perceptual distance between colors
 
     Returns:
-        List of optimized hex color strings
+        List of optimized hex color strings; the original colors if they are already
+        at least target_distance apart
     """
+    view = colors if isinstance(colors, PaletteView) else None
+    if view is not None:
+        colors = list(view.colors)
+
     if len(colors) <= 1:
         return colors
 
     try:
+        if view is None:
+            view = prepare_palette(colors)
+        if len(view.hex) != len(view.colors):
+            raise ValueError("Palette contains invalid colors")
+
+        # Nothing to do if the palette already meets the target spacing
+        if validate_palette_accessibility(view, target_distance, mode="valid_only")["valid"]:
+            return colors
+
         # Extract hues from existing colors
-        hues = []
-        lightness_values = []
-        saturation_values = []
-
-        for color in colors:
-            r, g, b = hex_to_rgb(color)
-            h, s, lightness = rgb_to_hsl(r, g, b)
-            hues.append(h)
-            lightness_values.append(lightness)
-            saturation_values.append(s)
-
-        # Calculate average lightness and saturation
-        avg_lightness = sum(lightness_values) / len(lightness_values)
-        avg_saturation = sum(saturation_values) / len(saturation_values)
-
-        # Optimize hue distribution
-        base_hue = hues[0]  # Use first hue as base
-        optimized_hues = calculate_perceptual_hue_steps(
-            base_hue, len(colors), target_distance,
-            avg_lightness * 100, avg_saturation * 100
-        )
+        saturation_values = view.hsl[:, 1].tolist()
+        lightness_values = view.hsl[:, 2].tolist()
+
+        # Optimize hue distribution. Lightness and chroma only feed input validation in
+        # calculate_perceptual_hue_steps, so the defaults are passed instead of palette averages.
+        base_hue = float(view.hsl[0, 0])  # Use first hue as base
+        optimized_hues = calculate_perceptual_hue_steps(base_hue, len(colors), target_distance)
 
-        # Generate optimized colors
+        # Generate optimized colors, one per original color
         optimized_colors = []
-        for i, hue in enumerate(optimized_hues):
+        for hue, original_s, original_l in zip(optimized_hues, saturation_values, lightness_values):
             # Use original lightness and saturation for each color
-            original_l = lightness_values[i] if i < len(lightness_values) else avg_lightness
-            original_s = saturation_values[i] if i < len(saturation_values) else avg_saturation
-
-            rgb_color = hsl_to_rgb(hue, original_s, original_l)
-            optimized_colors.append(rgb_to_hex(rgb_color))
+            optimized_colors.append(hsl_to_hex(hue, original_s, original_l))
 
         return optimized_colors
 
@@ -275,18 +377,12 @@ def _fallback_palette_generation(base_color: str, count: int) -> List[str]:
         List of hex color strings
     """
     try:
-        r, g, b = hex_to_rgb(base_color)
-        h, s, lightness = rgb_to_hsl(r, g, b)
+        h, s, lightness = _hex_to_hsl(base_color)
 
-        colors = []
         step = 360.0 / count
+        hues = (h + np.arange(count) * step) % 360.0
 
-        for i in range(count):
-            hue = (h + i * step) % 360.0
-            rgb_color = hsl_to_rgb(hue, s, lightness)
-            colors.append(rgb_to_hex(rgb_color))
-
-        return colors
+        return _hsl_to_hex_batch(hues, s, lightness)
 
     except (ValueError, TypeError) as e:
         # Log fallback usage
@@ -295,6 +391,31 @@ def _fallback_palette_generation(base_color: str, count: int) -> List[str]:
         return [base_color] * count
 
 
+def _hsl_to_hex_batch(hues: np.ndarray, s: float, lightness: float) -> List[str]:
+    """Vectorized ``rgb_to_hex(hsl_to_rgb(hue, s, lightness))`` over an array of hues."""
+    h = (hues % 360) / 360.0
+
+    if s == 0:
+        channels = np.full((len(h), 3), lightness, dtype=np.float64)
+    else:
+        q = lightness * (1 + s) if lightness < 0.5 else lightness + s - lightness * s
+        p = 2 * lightness - q
+
+        # Same piecewise hue-to-channel function as hsl_to_rgb, for R, G and B at once
+        t = np.stack([h + 1 / 3, h, h - 1 / 3], axis=1)
+        t = np.where(t < 0, t + 1, t)
+        t = np.where(t > 1, t - 1, t)
+        channels = np.select(
+            [t < 1 / 6, t < 1 / 2, t < 2 / 3],
+            [p + (q - p) * 6 * t, q, p + (q - p) * (2 / 3 - t) * 6],
+            default=p,
+        )
+
+    rgb = np.clip(np.rint(channels * 255), 0, 255).astype(np.uint8)
+    digits = rgb.tobytes().hex()
+    return ["#" + digits[i : i + 6] for i in range(0, len(digits), 6)]
+
+
 def get_palette_statistics(colors: List[str]) -> Dict[str, Any]:
     """
     Get comprehensive statistics about a color palette's perceptual properties.
@@ -309,30 +430,25 @@ def get_palette_statistics(colors: List[str]) -> Dict[str, Any]:
         return {"error": "Empty palette"}
 
     try:
-        # Convert to HSL for analysis
-        hsl_colors = []
-        for color in colors:
-            r, g, b = hex_to_rgb(color)
-            h, s, lightness = rgb_to_hsl(r, g, b)
-            hsl_colors.append((h, s, lightness))
-
-        # Calculate statistics
-        hues = [h for h, s, lightness in hsl_colors]
-        saturations = [s for h, s, lightness in hsl_colors]
-        lightnesses = [lightness for h, s, lightness in hsl_colors]
-
-        # Hue distribution analysis
-        hue_range = max(hues) - min(hues) if len(hues) > 1 else 0
-        hue_std = _calculate_std(hues) if len(hues) > 1 else 0
+        # Convert to HSL for analysis; columns are hue, saturation, lightness
+        hsl = np.empty((len(colors), 3), dtype=np.float64)
+        for i, color in enumerate(colors):
+            hsl[i] = _hex_to_hsl(color)
+
+        # Calculate statistics for all three channels at once
+        mins = hsl.min(axis=0)
+        maxs = hsl.max(axis=0)
+        means = hsl.mean(axis=0)
+        stds = hsl.std(axis=0)
 
         return {
             "color_count": len(colors),
-            "hue_range": round(hue_range, 2),
-            "hue_std_dev": round(hue_std, 2),
-            "avg_saturation": round(sum(saturations) / len(saturations), 3),
-            "avg_lightness": round(sum(lightnesses) / len(lightnesses), 3),
-            "saturation_range": round(max(saturations) - min(saturations), 3),
-            "lightness_range": round(max(lightnesses) - min(lightnesses), 3),
+            "hue_range": round(float(maxs[0] - mins[0]), 2),
+            "hue_std_dev": round(float(stds[0]), 2),
+            "avg_saturation": round(float(means[1]), 3),
+            "avg_lightness": round(float(means[2]), 3),
+            "saturation_range": round(float(maxs[1] - mins[1]), 3),
+            "lightness_range": round(float(maxs[2] - mins[2]), 3),
             "colors": colors
         }
 
@@ -340,12 +456,3 @@ def get_palette_statistics(colors: List[str]) -> Dict[str, Any]:
         logger.error(f"Palette statistics analysis failed: {str(e)}")
         return {"error": f"Analysis failed: {str(e)}"}
 
-
-def _calculate_std(values: List[float]) -> float:
-    """Calculate standard deviation of a list of values."""
-    if len(values) < 2:
-        return 0.0
-
-    mean = sum(values) / len(values)
-    variance = sum((x - mean) ** 2 for x in values) / len(values)
-    return variance ** 0.5
@@ -7,37 +7,59 @@ focused on Docker installation mode validation.
 """
 
 import argparse
+import functools
+import importlib.util
+import io
 import os
 import subprocess
 import sys
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
 from pathlib import Path
 
 
-def run_command(cmd, description="", cwd=None):
-    """Run a command and capture output."""
+# Lines of command output kept for the results summary; everything is streamed live
+OUTPUT_TAIL_LINES = 200
+
+
+def run_command(cmd, description="", cwd=None, timeout=300):
+    """Run a command, streaming its output live and keeping the last lines for reporting."""
     print(f"\n🔄 {description}")
     print(f"Running: {' '.join(cmd)}")
     
     try:
-        result = subprocess.run(
-            cmd, 
+        proc = subprocess.Popen(
+            cmd,
             cwd=cwd,
-            capture_output=True, 
-            text=True, 
-            timeout=300
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
         )
+        # Reading stdout blocks, so enforce the timeout by killing the process from a timer
+        timed_out = threading.Event()
+        timer = threading.Timer(timeout, lambda: (timed_out.set(), proc.kill()))
+        timer.start()
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        try:
+            for line in proc.stdout:
+                print(line, end="")
+                tail.append(line)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
         
-        if result.returncode == 0:
+        output = "".join(tail)
+        if returncode == 0:
             print(f"✅ {description} - PASSED")
-            if result.stdout.strip():
-                print(f"Output: {result.stdout}")
         else:
             print(f"❌ {description} - FAILED")
-            print(f"Error: {result.stderr}")
-            if result.stdout.strip():
-                print(f"Output: {result.stdout}")
         
-        return result.returncode == 0, result.stdout, result.stderr
+        return returncode == 0, output, ""
         
     except subprocess.TimeoutExpired:
         print(f"⏰ {description} - TIMEOUT")
@@ -47,8 +69,9 @@ def run_command(cmd, description="", cwd=None):
         return False, "", str(e)
 
 
+@functools.lru_cache(maxsize=1)
 def check_docker():
-    """Check if Docker is available and running."""
+    """Check if Docker is available and running (cached; Docker and E2E runs both ask)."""
     success, _, _ = run_command(
         ["docker", "info"], 
         "Checking Docker availability"
@@ -77,50 +100,70 @@ def check_dependencies():
     return all_good
 
 
-def run_unit_tests():
-    """Run all unit tests."""
-    print("\n🧪 Running Unit Tests")
-    
-    test_commands = [
-        (
-            ["python", "-m", "pytest", "tests/unit/", "-v", "--tb=short"],
-            "Unit tests"
-        ),
-        (
-            ["python", "-m", "pytest", "tests/webui/", "-v", "--tb=short"],
-            "WebUI tests"
-        ),
-        (
-            ["python", "-m", "pytest", "tests/api/test_api_comprehensive.py::TestAPIHealthEndpoints", "-v"],
-            "API health tests"
-        )
-    ]
-    
-    results = []
-    for cmd, description in test_commands:
-        success, stdout, stderr = run_command(cmd, description)
-        results.append((description, success, stdout, stderr))
-    
-    return results
+# Host-only test targets, as (pytest target, description) pairs per report category.
+# These have no Docker requirement, so run_local_tests() runs them in one pytest process.
+UNIT_TARGETS = [
+    ("tests/unit/", "Unit tests"),
+    ("tests/webui/", "WebUI tests"),
+    ("tests/api/test_api_comprehensive.py::TestAPIHealthEndpoints", "API health tests"),
+]
+INTEGRATION_TARGETS = [
+    ("tests/integration/", "Integration tests"),
+]
 
 
-def run_integration_tests():
-    """Run integration tests."""
-    print("\n🔗 Running Integration Tests")
-    
-    test_commands = [
-        (
-            ["python", "-m", "pytest", "tests/integration/", "-v", "--tb=short"],
-            "Integration tests"
-        ),
-    ]
-    
-    results = []
-    for cmd, description in test_commands:
-        success, stdout, stderr = run_command(cmd, description)
-        results.append((description, success, stdout, stderr))
-    
-    return results
+def _junit_prefix(target):
+    """Map a pytest target path to the dotted classname prefix it produces in JUnit XML."""
+    path, _, node = target.partition("::")
+    prefix = path.rstrip("/").removesuffix(".py").replace("/", ".")
+    return f"{prefix}.{node.replace('::', '.')}" if node else prefix
+
+
+def _failed_classnames(junit_path):
+    """Classnames of failed or errored testcases in a JUnit XML report, or None if it is unreadable."""
+    try:
+        tree = ET.parse(junit_path)
+    except (ET.ParseError, OSError):
+        return None
+    return {
+        case.get("classname", "")
+        for case in tree.iter("testcase")
+        if case.find("failure") is not None or case.find("error") is not None
+    }
+
+
+def run_local_tests(categories):
+    """Run every host-only test category in a single pytest invocation.
+
+    ``categories`` maps a report category to its ``(target, description)`` pairs.
+    Per-target results are recovered from the run's JUnit XML report, so the
+    summary keeps the same breakdown as running each target separately.
+    """
+    targets = [pair for pairs in categories.values() for pair in pairs]
+    print(f"\n🧪 Running {', '.join(categories)}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        junit_path = os.path.join(tmp_dir, "results.xml")
+        cmd = ["python", "-m", "pytest", *(t for t, _ in targets), "-v", "--tb=short", f"--junitxml={junit_path}"]
+        if importlib.util.find_spec("xdist") is not None:
+            # Spread the batch over all cores; loadscope keeps module/class fixtures on one worker
+            cmd += ["-n", "auto", "--dist", "loadscope"]
+        success, stdout, stderr = run_command(cmd, "Host-only tests", timeout=600)
+        failed = _failed_classnames(junit_path)
+
+    all_results = {}
+    for category, pairs in categories.items():
+        results = []
+        for target, description in pairs:
+            if failed is None:
+                # No report (e.g. collection crash or timeout): fall back to the overall outcome
+                target_ok = success
+            else:
+                prefix = _junit_prefix(target)
+                target_ok = not any(c == prefix or c.startswith(prefix + ".") for c in failed)
+            results.append((description, target_ok, stdout, stderr))
+        all_results[category] = results
+    return all_results
 
 
 def run_docker_tests():
@@ -207,30 +250,30 @@ def run_e2e_tests():
 
 def generate_report(all_results):
     """Generate a comprehensive test report."""
-    print("\n📊 Test Results Summary")
-    print("=" * 60)
-    
-    total_tests = 0
-    passed_tests = 0
+    buf = io.StringIO()
+    buf.write("\n📊 Test Results Summary\n")
+    buf.write("=" * 60 + "\n")
     
+    outcomes = Counter()
     for category, results in all_results.items():
-        print(f"\n{category}:")
+        buf.write(f"\n{category}:\n")
         for description, success, stdout, stderr in results:
             status = "✅ PASS" if success else "❌ FAIL"
-            print(f"  {status} {description}")
-            total_tests += 1
-            if success:
-                passed_tests += 1
+            buf.write(f"  {status} {description}\n")
+            outcomes[success] += 1
     
-    print("\n" + "=" * 60)
-    print(f"Total: {passed_tests}/{total_tests} tests passed")
+    total_tests = outcomes.total()
+    passed_tests = outcomes[True]
+    buf.write("\n" + "=" * 60 + "\n")
+    buf.write(f"Total: {passed_tests}/{total_tests} tests passed\n")
     
     if passed_tests == total_tests:
-        print("🎉 All tests passed!")
-        return True
+        buf.write("🎉 All tests passed!\n")
     else:
-        print(f"⚠️  {total_tests - passed_tests} tests failed")
-        return False
+        buf.write(f"⚠️  {total_tests - passed_tests} tests failed\n")
+    # Emit the whole report in one write
+    sys.stdout.write(buf.getvalue())
+    return passed_tests == total_tests
 
 
 def main():
@@ -267,12 +310,16 @@ def main():
     # Collect all test results
     all_results = {}
     
-    # Run specific test categories or all
+    # Run specific test categories or all; host-only categories share one pytest run
+    local_categories = {}
     if args.unit or not any([args.integration, args.docker, args.e2e]):
-        all_results["Unit Tests"] = run_unit_tests()
+        local_categories["Unit Tests"] = UNIT_TARGETS
     
     if args.integration or not any([args.unit, args.docker, args.e2e]):
-        all_results["Integration Tests"] = run_integration_tests()
+        local_categories["Integration Tests"] = INTEGRATION_TARGETS
+    
+    if local_categories:
+        all_results.update(run_local_tests(local_categories))
     
     if args.docker or not any([args.unit, args.integration, args.e2e]):
         all_results["Docker Tests"] = run_docker_tests()
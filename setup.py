@@ -1,7 +1,6 @@
-import glob
+import itertools
 import os
 import pathlib
-import re
 import sys
 
 from setuptools import setup  # type: ignore[import-untyped]
@@ -12,29 +11,32 @@ here = pathlib.Path(__file__).parent.resolve()
 
 # Function to read requirements from a file
 def read_requirements(filename):
-    requirements = []
-    if os.path.isfile(filename):
-        with open(filename, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    # Skip recursive includes to avoid duplication
-                    if line.startswith("-r "):
-                        continue
-                    requirements.append(line)
-    return requirements
+    path = pathlib.Path(filename)
+    if not path.is_file():
+        return []
+    stripped = (line.strip() for line in path.read_text().splitlines())
+    # Skip comments and recursive includes (the latter to avoid duplication)
+    return [line for line in stripped if line and not line.startswith(("#", "-r "))]
 
 
 # Read main requirements
 main_requirements = read_requirements(os.path.join(here, "requirements.txt"))
 
-# Get all requirement files from the requirements directory
+# Get all requirement files from the requirements directory in a single scan
+# e.g., 'requirements-dev.txt' -> group 'dev'
 req_dir = os.path.join(here, "requirements")
-req_files = glob.glob(os.path.join(req_dir, "requirements-*.txt"))
+req_files = {}
+if os.path.isdir(req_dir):
+    with os.scandir(req_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("requirements-") and name.endswith(".txt"):
+                group_name = name[len("requirements-") : -len(".txt")]
+                if group_name:
+                    req_files[group_name] = entry.path
 
 # Check if requirements-all.txt exists (it shouldn't)
-all_req_file = os.path.join(req_dir, "requirements-all.txt")
-if os.path.exists(all_req_file):
+if "all" in req_files:
     sys.stderr.write(
         "ERROR: requirements-all.txt should not exist as 'all' is a special key "
         "that is dynamically generated from all other requirement files.\n"
@@ -44,27 +46,11 @@ if os.path.exists(all_req_file):
     sys.exit(1)
 
 # Dictionary to store all extra requirements
-extras_require = {}
-
-# Process each requirements file
-for req_file in req_files:
-    # Extract the group name from the filename
-    # e.g., 'requirements-dev.txt' -> 'dev'
-    basename = os.path.basename(req_file)
-    match = re.match(r"requirements-(.+)\.txt", basename)
-    if match:
-        group_name = match.group(1)
-        # Skip the 'all' group as we'll build it dynamically
-        if group_name != "all":
-            group_requirements = read_requirements(req_file)
-            extras_require[group_name] = group_requirements
+extras_require = {group_name: read_requirements(path) for group_name, path in req_files.items()}
 
 # Build the 'all' group dynamically by combining all other groups
-all_requirements = list(main_requirements)  # Start with main requirements
-for group, reqs in extras_require.items():
-    all_requirements.extend(reqs)
 # Remove duplicates while preserving order
-all_requirements = list(dict.fromkeys(all_requirements))
+all_requirements = list(dict.fromkeys(itertools.chain(main_requirements, *extras_require.values())))
 extras_require["all"] = all_requirements
 
 # Print available extras for information
@@ -11,20 +11,18 @@ from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from httpx import AsyncClient
-from mongomock_motor import AsyncMongoMockClient
 
-from deep_search_persist.deep_search_persist.api_endpoints import app
-from deep_search_persist.deep_search_persist.helper_classes import Message, Messages
-from deep_search_persist.deep_search_persist.persistence.session_persistence import (
-    SessionPersistenceManager, SessionStatus
-)
-from deep_search_persist.deep_search_persist.research_session import ResearchSession
+# The app, persistence layer and Mongo mock are imported inside the fixtures and
+# tests that use them so that collecting a targeted run stays cheap.
 
 
-@pytest.fixture
-async def mock_persistence():
-    """Create a mock persistence manager."""
+@pytest.fixture(scope="session")
+def _mock_persistence():
+    """Persistence manager backed by an in-memory MongoDB mock, built once per test session."""
+    from mongomock_motor import AsyncMongoMockClient
+    
+    from deep_search_persist.deep_search_persist.persistence.session_persistence import SessionPersistenceManager
+    
     mock_client = AsyncMongoMockClient()
     persistence = SessionPersistenceManager("mongodb://mock:27017/test")
     
@@ -34,18 +32,29 @@ async def mock_persistence():
     persistence.session_collection = persistence.db["sessions"]
     persistence.validation_hashes_collection = persistence.db["session_validation_hashes"]
     
-    # Clear collections
-    await persistence.session_collection.delete_many({})
-    await persistence.validation_hashes_collection.delete_many({})
-    
     return persistence
 
 
 @pytest.fixture
-def api_client():
-    """Create test client."""
-    from fastapi.testclient import TestClient
-    return TestClient(app)
+def mock_persistence(_mock_persistence):
+    """Create a mock persistence manager, with empty collections for each test."""
+    # Fresh collection names give an empty namespace without scanning out the previous test's documents
+    suffix = uuid.uuid4().hex
+    _mock_persistence.session_collection = _mock_persistence.db[f"sessions_{suffix}"]
+    _mock_persistence.validation_hashes_collection = _mock_persistence.db[f"session_validation_hashes_{suffix}"]
+    
+    return _mock_persistence
+
+
+@pytest.fixture(scope="module")
+async def api_client():
+    """Create an async test client over the app's ASGI interface, shared by the tests in this module."""
+    from httpx import ASGITransport, AsyncClient
+    
+    from deep_search_persist.deep_search_persist.api_endpoints import app
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
 
 
 @pytest.mark.api
@@ -53,23 +62,23 @@ def api_client():
 class TestAPIHealthEndpoints:
     """Test API health and status endpoints."""
     
-    def test_health_endpoint(self, api_client):
+    async def test_health_endpoint(self, api_client):
         """Test health check endpoint."""
-        response = api_client.get("/health")
+        response = await api_client.get("/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
     
-    def test_root_endpoint(self, api_client):
+    async def test_root_endpoint(self, api_client):
         """Test root endpoint."""
-        response = api_client.get("/")
+        response = await api_client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
     
-    def test_healthcheck_endpoint(self, api_client):
+    async def test_healthcheck_endpoint(self, api_client):
         """Test healthcheck endpoint."""
-        response = api_client.get("/healthcheck")
+        response = await api_client.get("/healthcheck")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
@@ -97,7 +106,9 @@ class TestAPISessionEndpoints:
     @pytest.mark.asyncio
     async def test_list_sessions_with_data(self, mock_persistence_global, api_client):
         """Test listing sessions with mock data."""
-        from deep_search_persist.deep_search_persist.persistence.session_persistence import SessionSummary
+        from deep_search_persist.deep_search_persist.persistence.session_persistence import (
+            SessionStatus, SessionSummary
+        )
         
         # Create mock session summary
         mock_session = SessionSummary(
@@ -164,6 +175,26 @@ class TestAPISessionEndpoints:
         mock_persistence_global.delete_session.assert_called_once_with("test-session-123")
 
 
+# Chat completion requests in the message formats the endpoint must accept
+_TRANSFORMATION_REQUESTS = [
+    # Standard format
+    {
+        "model": "test-model",
+        "messages": [
+            {"role": "user", "content": "Test"}
+        ]
+    },
+    # With system message
+    {
+        "model": "test-model", 
+        "messages": [
+            {"role": "system", "content": "System prompt"},
+            {"role": "user", "content": "User query"}
+        ]
+    }
+]
+
+
 @pytest.mark.api
 @pytest.mark.integration 
 class TestAPIChatCompletions:
@@ -218,32 +249,15 @@ class TestAPIChatCompletions:
         assert response.status_code == 422
     
     @pytest.mark.asyncio
-    async def test_chat_completions_message_transformation(self, api_client):
+    @pytest.mark.parametrize("request_data", _TRANSFORMATION_REQUESTS, ids=["standard", "with_system"])
+    async def test_chat_completions_message_transformation(self, api_client, mock_persistence, request_data):
         """Test message transformation logic."""
-        # Test with various message formats
-        test_cases = [
-            # Standard format
-            {
-                "model": "test-model",
-                "messages": [
-                    {"role": "user", "content": "Test"}
-                ]
-            },
-            # With system message
-            {
-                "model": "test-model", 
-                "messages": [
-                    {"role": "system", "content": "System prompt"},
-                    {"role": "user", "content": "User query"}
-                ]
-            }
-        ]
-        
-        for request_data in test_cases:
-            # This will test the transformation logic, even if the full request fails
+        # This will test the transformation logic, even if the full request fails.
+        # Sessions go to the in-memory mock so saves don't wait on a real MongoDB.
+        with patch('deep_search_persist.deep_search_persist.api_endpoints.persistence', mock_persistence):
             response = await api_client.post("/v1/chat/completions", json=request_data)
-            # Should not fail due to message format (422 would indicate format error)
-            assert response.status_code != 422
+        # Should not fail due to message format (422 would indicate format error)
+        assert response.status_code != 422
 
 
 @pytest.mark.api
@@ -254,6 +268,7 @@ class TestAPIRequestTransformation:
     def test_transform_chat_completion_request_list_messages(self):
         """Test transforming list of message dicts."""
         from deep_search_persist.deep_search_persist.api_endpoints import transform_chat_completion_request
+        from deep_search_persist.deep_search_persist.helper_classes import Messages
         
         raw_request = {
             "model": "test-model",
@@ -272,6 +287,7 @@ class TestAPIRequestTransformation:
     def test_transform_chat_completion_request_single_message(self):
         """Test transforming single message dict."""
         from deep_search_persist.deep_search_persist.api_endpoints import transform_chat_completion_request
+        from deep_search_persist.deep_search_persist.helper_classes import Messages
         
         raw_request = {
             "model": "test-model", 
@@ -293,6 +309,17 @@ class TestAPIRequestTransformation:
         
         with pytest.raises(ValueError):
             transform_chat_completion_request(raw_request)
+    
+    def test_transform_chat_completion_request_leaves_raw_body_intact(self):
+        """Test that transforming does not mutate the caller's request dict."""
+        from deep_search_persist.deep_search_persist.api_endpoints import transform_chat_completion_request
+        
+        messages = [{"role": "user", "content": "Test message"}]
+        raw_request = {"model": "test-model", "messages": messages}
+        
+        transform_chat_completion_request(raw_request)
+        assert raw_request["messages"] is messages
+        assert messages == [{"role": "user", "content": "Test message"}]
 
 
 @pytest.mark.api
@@ -342,39 +369,39 @@ class TestAPIPerformance:
     @pytest.mark.asyncio
     async def test_concurrent_session_requests(self, mock_persistence_global, api_client):
         """Test handling of concurrent session requests."""
-        mock_persistence_global.list_sessions.return_value = []
+        mock_persistence_global.list_sessions = AsyncMock(return_value=[])
         
-        # Make multiple concurrent requests
-        tasks = []
-        for _ in range(10):
-            task = api_client.get("/sessions")
-            tasks.append(task)
-        
-        responses = await asyncio.gather(*tasks)
+        # Make multiple concurrent requests through the ASGI app
+        responses = await asyncio.gather(*(api_client.get("/sessions") for _ in range(10)))
         
         # All should succeed
-        for response in responses:
-            assert response.status_code == 200
+        assert [response.status_code for response in responses] == [200] * 10
+        assert mock_persistence_global.list_sessions.await_count == 10
     
-    @patch('deep_search_persist.deep_search_persist.api_endpoints.persistence')
-    @pytest.mark.asyncio
-    async def test_large_session_list_performance(self, mock_persistence_global, api_client):
-        """Test performance with large session lists."""
-        from deep_search_persist.deep_search_persist.persistence.session_persistence import SessionSummary
+    @pytest.fixture(scope="module")
+    def hundred_sessions(self):
+        """100 completed session summaries with a fixed timestamp, built once per module."""
+        from deep_search_persist.deep_search_persist.persistence.session_persistence import (
+            SessionStatus, SessionSummary
+        )
         
-        # Create many mock sessions
-        mock_sessions = []
-        for i in range(100):
-            session = SessionSummary(
+        now = datetime(2024, 1, 1)
+        return [
+            SessionSummary(
                 session_id=f"session-{i}",
                 user_query=f"Query {i}",
                 status=SessionStatus.COMPLETED,
-                created_at=datetime.now(),
-                updated_at=datetime.now()
+                created_at=now,
+                updated_at=now
             )
-            mock_sessions.append(session)
-        
-        mock_persistence_global.list_sessions.return_value = mock_sessions
+            for i in range(100)
+        ]
+    
+    @patch('deep_search_persist.deep_search_persist.api_endpoints.persistence')
+    @pytest.mark.asyncio
+    async def test_large_session_list_performance(self, mock_persistence_global, api_client, hundred_sessions):
+        """Test performance with large session lists."""
+        mock_persistence_global.list_sessions = AsyncMock(return_value=hundred_sessions)
         
         response = await api_client.get("/sessions")
         assert response.status_code == 200
@@ -18,6 +18,9 @@ from deep_search_persist.deep_search_persist.research_session import ResearchSes
 # For E2E tests, we assume the Docker environment is up and accessible.
 API_BASE_URL = "http://localhost:8000/v1"  # Assuming port 8000 is exposed from app-persist
 
+# These tests need the full Docker stack (API, MongoDB, SearXNG, Ollama); run them with `-m e2e`
+pytestmark = pytest.mark.e2e
+
 
 # Fixture for the FastAPI test client (connecting to the running Docker service)
 @pytest.fixture(scope="module")
@@ -4,7 +4,7 @@ import json
 import re
 import uuid
 from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, patch
+from unittest.mock import DEFAULT, patch
 
 import pytest
 from bson import ObjectId  # Import ObjectId for mock_mongo_client queries
@@ -12,6 +12,7 @@ from httpx import AsyncClient, ASGITransport
 from mongomock_motor import AsyncMongoMockClient  # For mocking MongoDB
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from deep_search_persist.deep_search_persist import helper_functions
 from deep_search_persist.deep_search_persist.api_endpoints import app, persistence
 from deep_search_persist.deep_search_persist.helper_classes import Message, Messages
 from deep_search_persist.deep_search_persist.persistence.session_persistence import (
@@ -22,6 +23,40 @@ from deep_search_persist.deep_search_persist.persistence.utils import clean_dict
 from deep_search_persist.deep_search_persist.research_session import ResearchSession
 
 
+# Canned results for the research steps mocked by the research_steps fixture
+_STEP_RESULTS = {
+    "make_initial_searching_plan_async": "Plan: Search for capital of France.",
+    "generate_search_queries_async": ["capital of France"],
+    "perform_search_async": ["http://example.com/paris"],
+    "judge_search_result_and_future_plan_async": "<done>",
+    "generate_final_report_async": "The capital of France is Paris.",
+}
+
+# What the mocked process_link yields for each link
+_LINK_RESULTS = ("url:http://example.com/paris\ncontext:Paris is the capital of France.",)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _mk_link_gen(*_args, **_kwargs):
+    """Stand-in for process_link: returns an async iterator over _LINK_RESULTS."""
+    return _aiter(_LINK_RESULTS)
+
+
+# Fixture that mocks the LLM/search helpers so a research run makes no external requests
+@pytest.fixture
+def research_steps():
+    """Patch the helper_functions steps of one research iteration in a single patch.multiple."""
+    with patch.multiple(helper_functions, process_link=DEFAULT, **dict.fromkeys(_STEP_RESULTS, DEFAULT)) as mocks:
+        for name, result in _STEP_RESULTS.items():
+            mocks[name].return_value = result
+        mocks["process_link"].side_effect = _mk_link_gen
+        yield mocks
+
+
 # Fixture for a mocked MongoDB client
 @pytest.fixture(name="mock_mongo_client")
 async def mock_mongo_client_fixture():
@@ -85,42 +120,14 @@ async def test_health_check(test_client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("research_steps")
 async def test_chat_completions_new_session(test_client, mock_persistence_manager):
     """Test chat completions endpoint for a new session, verifying session persistence."""
     user_query = "What is the capital of France?"
     messages = [{"role": "user", "content": user_query}]
     request_payload = {"messages": messages, "max_iterations": 1}
 
-    # Mock LLM calls to avoid actual external requests during integration test
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.make_initial_searching_plan_async",
-        return_value="Plan: Search for capital of France.",
-    ):
-        with patch(
-            "deep_search_persist.deep_search_persist.helper_functions.generate_search_queries_async",
-            return_value=["capital of France"],
-        ):
-            with patch(
-                "deep_search_persist.deep_search_persist.helper_functions.perform_search_async",
-                return_value=["http://example.com/paris"],
-            ):
-                with patch(
-                    "deep_search_persist.deep_search_persist.helper_functions.process_link", new_callable=AsyncMock
-                ) as mock_process_link:
-                    mock_process_link.return_value = AsyncGeneratorMock(
-                        ["url:http://example.com/paris\ncontext:Paris is the capital of France."]
-                    )
-                    with patch(
-                        "deep_search_persist.deep_search_persist.helper_functions.judge_search_result_and_future_plan_async",
-                        return_value="<done>",
-                    ):
-                        with patch(
-                            "deep_search_persist.deep_search_persist.helper_functions.generate_final_report_async",
-                            return_value="The capital of France is Paris.",
-                        ):
-                            response = await test_client.post(
-                                "/chat/completions", json=request_payload, timeout=60
-                            )  # Increased timeout
+    response = await test_client.post("/chat/completions", json=request_payload, timeout=60)  # Increased timeout
 
     assert response.status_code == 200
 
@@ -436,18 +443,3 @@ async def test_rollback_session_not_found(test_client):
         response.status_code == 400
     )  # The API returns 400 for "Could not rollback: No history available for this session."
     assert "No history available for this session." in response.json()["detail"]
-
-
-import inspect
-
-# Helper for AsyncMock and AsyncGeneratorMock
-from unittest.mock import AsyncMock, patch
-
-
-class AsyncGeneratorMock:
-    def __init__(self, iterable):
-        self.iterable = iterable
-
-    async def __aiter__(self):
-        for item in self.iterable:
-            yield item
@@ -10,7 +10,11 @@ import tempfile
 import subprocess
 
 from deep_search_persist.simple_webui.utils.color_schemes import generate_perceptual_palette
-from deep_search_persist.simple_webui.utils.hue_spacing_calculator import validate_palette_accessibility
+from deep_search_persist.simple_webui.utils.hue_spacing_calculator import (
+    optimize_existing_palette,
+    prepare_palette,
+    validate_palette_accessibility,
+)
 from deep_search_persist.simple_webui.utils.color_convert import hex_to_rgb  # Used for basic validation
 
 
@@ -109,6 +113,46 @@ class TestColorIntegration(unittest.TestCase):
                     "Minimum perceptual distance not met (allowing small tolerance)"
                 )
 
+    def test_prepared_palette_matches_hex_list(self):
+        """Test that validate/optimize give the same results for a PaletteView as for the hex list."""
+        palette = ["#FF0000", "#FF1000", "#00FF00", "#0000FF"]
+        view = prepare_palette(palette)
+
+        self.assertEqual(validate_palette_accessibility(view, 25.0), validate_palette_accessibility(palette, 25.0))
+        self.assertEqual(optimize_existing_palette(view, 25.0), optimize_existing_palette(palette, 25.0))
+
+    def test_prepared_palette_skips_invalid_colors(self):
+        """Test that prepare_palette keeps the input but only converts valid colors."""
+        view = prepare_palette(["#FF0000", "#NOTAHEX", "#0000FF"])
+
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view.hex, ("#FF0000", "#0000FF"))
+        self.assertEqual(view.ucs.shape, (2, 3))
+        self.assertEqual(optimize_existing_palette(view), ["#FF0000", "#NOTAHEX", "#0000FF"])
+
+    def test_optimize_keeps_well_spaced_palette(self):
+        """Test that a palette already meeting the target distance is returned unchanged."""
+        palette = ["#FF0000", "#00FF00", "#0000FF"]
+
+        self.assertTrue(validate_palette_accessibility(palette, 20.0)["valid"])
+        self.assertEqual(optimize_existing_palette(palette, 20.0), palette)
+
+    def test_validate_palette_accessibility_modes(self):
+        """Test that the reduced validation modes agree with the full report."""
+        for palette in (["#FF0000", "#FF1000", "#0000FF"], ["#FF0000", "#00FF00", "#0000FF"]):
+            with self.subTest(palette=palette):
+                full = validate_palette_accessibility(palette, 20.0)
+                valid_only = validate_palette_accessibility(palette, 20.0, mode="valid_only")
+                min_only = validate_palette_accessibility(palette, 20.0, mode="min_only")
+
+                self.assertEqual(valid_only, {"valid": full["valid"]})
+                self.assertEqual(min_only["valid"], full["valid"])
+                self.assertEqual(min_only["min_distance"], full["min_distance"])
+                self.assertNotIn("violations", min_only)
+
+        with self.assertRaises(ValueError):
+            validate_palette_accessibility(["#FF0000", "#0000FF"], mode="fast")
+
 
     def test_pre_commit_hook_valid_file(self):
         """Test the pre-commit hook with a valid color scheme file."""
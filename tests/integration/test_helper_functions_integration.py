@@ -1,11 +1,9 @@
-import asyncio
-import json
-from typing import AsyncGenerator
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
-import aiohttp
 import pytest
 
+from deep_search_persist.deep_search_persist import helper_functions, local_ai
 from deep_search_persist.deep_search_persist.configuration import app_config
 from deep_search_persist.deep_search_persist.helper_classes import Message, Messages
 from deep_search_persist.deep_search_persist.helper_functions import (
@@ -19,268 +17,303 @@ from deep_search_persist.deep_search_persist.helper_functions import (
     perform_search_async,
     process_link,
 )
-from deep_search_persist.deep_search_persist.local_ai import call_llm_async, call_llm_async_parse_list, fetch_webpage_text_async
+from deep_search_persist.deep_search_persist.llm_providers import LLMProviderFactory
+from deep_search_persist.deep_search_persist.local_ai import (
+    call_llm_async,
+    call_llm_async_parse_list,
+    fetch_webpage_text_async,
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+# Canned LLM responses shared by the tests below
+_PLAN_RESPONSE = "<think>Outline the topic first.</think>1. Define quantum computing. 2. Explore applications."
+_PLAN = "1. Define quantum computing. 2. Explore applications."
+_NEXT_PLAN = "Updated research plan with more focus on quantum algorithms."
+_SEARCH_QUERIES = ["AI advancements 2023", "latest AI research"]
+_NEW_SEARCH_QUERIES = ["new query 1", "new query 2"]
+_FINAL_REPORT = "Final report content."
+_EXTRACTED_CONTEXT = "Relevant context is here."
+
+_SEARCH_QUERY = "test search"
+_SEARXNG_PARAMS = {"q": _SEARCH_QUERY, "format": "json"}
+
+_LINK = "http://example.com/process"
+_LINK_QUERY = "process test"
+_LINK_PAGE_TEXT = "<html><body>Useful content.</body></html>"
+_LINK_USEFULNESS = "Yes"
+_LINK_CONTEXT = "Useful content."
+
+
+# Shared ``async with ... as resp`` wrapper; tests set what __aenter__ returns via the async_cm fixture
+_ASYNC_CM = MagicMock()
+_ASYNC_CM.__aenter__ = AsyncMock()
+_ASYNC_CM.__aexit__ = AsyncMock(return_value=False)
+
+
+@pytest.fixture
+def async_cm() -> MagicMock:
+    yield _ASYNC_CM
+    _ASYNC_CM.__aenter__.reset_mock()
+    _ASYNC_CM.__aenter__.return_value = None
+    _ASYNC_CM.__aexit__.reset_mock()
+
+
+# One aiohttp session stand-in for the whole module; each test also patches the LLM/fetch helpers it reaches
+@pytest.fixture(scope="module")
+def _base_session() -> SimpleNamespace:
+    return SimpleNamespace(get=MagicMock(), post=MagicMock())
 
 
-# Fixture for an aiohttp client session
 @pytest.fixture
-async def http_session() -> AsyncGenerator[aiohttp.ClientSession, None]:
-    async with aiohttp.ClientSession() as session:
-        yield session
+def http_session(_base_session: SimpleNamespace) -> SimpleNamespace:
+    for method in (_base_session.get, _base_session.post):
+        method.reset_mock(return_value=True, side_effect=True)
+    return _base_session
 
 
 # --- Integration tests for LLM Interaction Helper Functions ---
 
 
-@pytest.mark.asyncio
-async def test_call_llm_async_openrouter_success(http_session):
-    """Test call_llm_async with OpenRouter success."""
+@pytest.mark.parametrize(
+    "llm_provider, factory_method, expected",
+    [
+        ("ollama", "get_ollama_provider", "Mocked Ollama response."),
+        ("openai_compatible", "get_openai_provider", "Mocked OpenAI-compatible response."),
+        ("lmstudio", "get_lmstudio_provider", "Mocked LMStudio response."),
+    ],
+)
+async def test_call_llm_async_routes_to_provider(http_session, monkeypatch, llm_provider, factory_method, expected):
+    """Test call_llm_async dispatches to the provider selected by app_config.llm_provider."""
     messages = Messages([Message(role="user", content="Hello")])
-    mock_response_content = "Mocked OpenRouter response."
+    provider = MagicMock()
+    provider.generate = AsyncMock(return_value=expected)
+
+    # Only the selected accessor returns a provider; reaching any other one fails the call
+    for accessor in ("get_ollama_provider", "get_openai_provider", "get_lmstudio_provider"):
+        if accessor == factory_method:
+            monkeypatch.setattr(LLMProviderFactory, accessor, MagicMock(return_value=provider))
+        else:
+            monkeypatch.setattr(
+                LLMProviderFactory, accessor, MagicMock(side_effect=AssertionError(f"{accessor} must not be called"))
+            )
+    monkeypatch.setattr(app_config, "llm_provider", llm_provider)
 
-    with patch(
-        "deep_search_persist.deep_search_persist.local_ai.call_openrouter_async", new_callable=AsyncMock
-    ) as mock_openrouter:
-        mock_openrouter.return_value = mock_response_content
-        with patch.object(app_config, 'use_ollama', False):
-            response = await call_llm_async(http_session, messages, model=app_config.default_model, ctx=app_config.default_model_ctx)
-            assert response == mock_response_content
-            mock_openrouter.assert_called_once_with(http_session, messages, model=app_config.default_model)
+    response = await call_llm_async(
+        http_session, messages, model=app_config.default_model, ctx=app_config.default_model_ctx
+    )
 
+    assert response == expected
+    provider.generate.assert_called_once()
 
-@pytest.mark.asyncio
-async def test_call_llm_async_ollama_success(http_session):
-    """Test call_llm_async with Ollama success."""
-    messages = Messages([Message(role="user", content="Hello")])
-    mock_response_content = "Mocked Ollama response."
-
-    class MockAsyncGenerator:
-        def __init__(self, content):
-            self.content = content
-            self.index = 0
-
-        async def __aiter__(self):
-            for char in self.content:
-                yield char
-                await asyncio.sleep(0.001)  # Simulate async behavior
-
-    with patch(
-        "deep_search_persist.deep_search_persist.local_ai.call_ollama_async", new_callable=AsyncMock
-    ) as mock_ollama:
-        mock_ollama.return_value = MockAsyncGenerator(mock_response_content)
-        with patch.object(app_config, 'use_ollama', True):
-            response = await call_llm_async(http_session, messages, model=app_config.default_model, ctx=app_config.default_model_ctx)
-            assert response == mock_response_content
-            mock_ollama.assert_called_once()  # Args are passed to the inner call_ollama_async
-
-
-@pytest.mark.asyncio
-async def test_make_initial_searching_plan_async(http_session):
+
+async def test_make_initial_searching_plan_async(http_session, monkeypatch):
     """Test make_initial_searching_plan_async."""
     user_message = Message(role="user", content="Research about quantum computing.")
     messages = Messages([user_message])
-    mock_plan = "1. Define quantum computing. 2. Explore applications."
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async", new_callable=AsyncMock
-    ) as mock_call_llm:
-        mock_call_llm.return_value = mock_plan
-        plan = await make_initial_searching_plan_async(http_session, messages)
-        assert plan == mock_plan
-        mock_call_llm.assert_called_once()
+    mock_call_llm = AsyncMock(return_value=_PLAN_RESPONSE)
+    monkeypatch.setattr(helper_functions, "call_llm_async", mock_call_llm)
+    plan = await make_initial_searching_plan_async(http_session, messages)
+    assert plan == _PLAN == helper_functions._THINK_RE.sub("", _PLAN_RESPONSE).strip()
+    mock_call_llm.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_judge_search_result_and_refine_plan_async(http_session):
+async def test_judge_search_result_and_refine_plan_async(http_session, monkeypatch):
     """Test judge_search_result_and_refine_plan_async."""
     user_message = Message(role="user", content="Quantum computing research.")
     messages = Messages([user_message])
     current_plan = "Initial plan."
     all_contexts_str = "Context 1. Context 2."
-    mock_next_plan = "Updated research plan with more focus on quantum algorithms."
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async", new_callable=AsyncMock
-    ) as mock_call_llm:
-        mock_call_llm.return_value = mock_next_plan
-        next_plan = await judge_search_result_and_refine_plan_async(
-            http_session, messages, current_plan, all_contexts_str
-        )
-        assert next_plan == mock_next_plan
-        mock_call_llm.assert_called_once()
-
-
-@pytest.mark.asyncio
-async def test_generate_search_queries_async(http_session):
+    async def stream_response():
+        for part in ("<think>Weigh the contexts.</think>", _NEXT_PLAN):
+            yield part
+
+    # This helper streams straight from call_ollama_async rather than going through call_llm_async
+    mock_call_ollama = MagicMock(return_value=stream_response())
+    monkeypatch.setattr(helper_functions, "call_ollama_async", mock_call_ollama)
+    next_plan = await judge_search_result_and_refine_plan_async(
+        http_session, messages, current_plan, all_contexts_str
+    )
+    assert next_plan == _NEXT_PLAN
+
+    mock_call_ollama.assert_called_once()
+    (sent_messages,), kwargs = mock_call_ollama.call_args
+    assert kwargs == {"model": app_config.reason_model, "ctx": app_config.reason_model_ctx}
+    system_msg, user_msg = sent_messages.get_messages()
+    assert system_msg.role == "system"
+    assert user_msg.role == "user"
+    assert f"User Query: {user_message.content}" in user_msg.content
+    assert f"Current Plan: {current_plan}" in user_msg.content
+    assert f"Combined Contexts: {all_contexts_str}" in user_msg.content
+
+
+async def test_generate_search_queries_async(http_session, monkeypatch):
     """Test generate_search_queries_async with new centralized parsing."""
     query_plan = "Find recent advancements in AI."
-    mock_queries = ["AI advancements 2023", "latest AI research"]
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async_parse_list", new_callable=AsyncMock
-    ) as mock_call_llm_parse:
-        mock_call_llm_parse.return_value = mock_queries  # Returns parsed list directly
-        queries = await generate_search_queries_async(http_session, query_plan)
-        assert queries == mock_queries
-        mock_call_llm_parse.assert_called_once()
+    mock_call_llm_parse = AsyncMock(return_value=_SEARCH_QUERIES)  # Returns parsed list directly
+    monkeypatch.setattr(helper_functions, "call_llm_async_parse_list", mock_call_llm_parse)
+    queries = await generate_search_queries_async(http_session, query_plan)
+    assert queries == _SEARCH_QUERIES
+    mock_call_llm_parse.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_generate_final_report_async(http_session):
+async def test_generate_final_report_async(http_session, monkeypatch):
     """Test generate_final_report_async."""
     user_message = Message(role="user", content="Report on climate change.")
     messages = Messages([user_message])
     report_planning = "Introduction, Causes, Effects, Solutions."
     all_contexts = ["Context A.", "Context B."]
-    mock_report = "Final report content."
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async", new_callable=AsyncMock
-    ) as mock_call_llm:
-        mock_call_llm.return_value = mock_report
-        report = await generate_final_report_async(http_session, messages, report_planning, all_contexts)
-        assert report == mock_report
-        mock_call_llm.assert_called_once()
+    mock_call_llm = AsyncMock(return_value=_FINAL_REPORT)
+    monkeypatch.setattr(helper_functions, "call_llm_async", mock_call_llm)
+    report = await generate_final_report_async(http_session, messages, report_planning, all_contexts)
+    assert report == _FINAL_REPORT
+    mock_call_llm.assert_called_once()
 
 
 # --- Integration tests for Web Interaction Helper Functions ---
 
 
-@pytest.mark.asyncio
-async def test_perform_search_async_success(http_session):
-    """Test perform_search_async with successful response from SearXNG."""
-    query = "test search"
-    mock_searxng_response = {
-        "results": [
-            {"url": "http://link1.com"},
-            {"url": "http://link2.com"},
-        ]
-    }
-
-    with patch("aiohttp.ClientSession.get", new_callable=AsyncMock) as mock_get:
-        mock_resp = MagicMock()
-        mock_resp.status = 200
-        mock_resp.json.return_value = mock_searxng_response
-        mock_get.return_value.__aenter__.return_value = mock_resp
-
-        links = await perform_search_async(http_session, query)
-        assert links == ["http://link1.com", "http://link2.com"]
-        mock_get.assert_called_once_with(app_config.base_searxng_url, params={"q": query, "format": "json"})
-
-
-@pytest.mark.asyncio
-async def test_fetch_webpage_text_async_playwright_html(http_session):
+@pytest.fixture(
+    params=[
+        (
+            200,
+            {"results": [{"url": "http://link1.com"}, {"url": "http://link2.com"}]},
+            ["http://link1.com", "http://link2.com"],
+        ),
+        (500, "Server error", []),
+    ],
+    ids=["ok", "server-error"],
+)
+def searxng_response(request):
+    """A SearXNG response mock and the links perform_search_async should return for it."""
+    status, payload, expected_links = request.param
+    resp = MagicMock()
+    resp.status = status
+    if status == 200:
+        resp.json = AsyncMock(return_value=payload)
+    else:
+        resp.text = AsyncMock(return_value=payload)
+        resp.json = AsyncMock(side_effect=Exception("json called after text"))
+    return resp, expected_links
+
+
+async def test_perform_search_async(http_session, async_cm, searxng_response):
+    """Test perform_search_async for successful and failed SearXNG responses."""
+    mock_resp, expected_links = searxng_response
+    async_cm.__aenter__.return_value = mock_resp
+    http_session.get.return_value = async_cm
+
+    links = await perform_search_async(http_session, _SEARCH_QUERY)
+    assert links == expected_links
+    http_session.get.assert_called_once_with(app_config.base_searxng_url, params=_SEARXNG_PARAMS)
+
+
+async def test_fetch_webpage_text_async_playwright_html(http_session, async_cm):
     """Test fetch_webpage_text_async with Playwright for HTML content."""
     url = "http://example.com/html"
     mock_title = "Example Page"
     mock_cleaned_html = "<div>Cleaned HTML content</div>"
     mock_markdown_text = "Markdown content"
 
-    with patch.object(app_config, 'use_jina', False):
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_EMBED_BROWSER", True):
-            with patch("playwright.async_api.async_playwright", new_callable=AsyncMock) as mock_playwright:
-                mock_browser = AsyncMock()
-                mock_context = AsyncMock()
-                mock_page = AsyncMock()
-
-                mock_playwright.return_value.__aenter__.return_value.chromium.launch.return_value = mock_browser
-                mock_browser.new_context.return_value = mock_context
-                mock_context.new_page.return_value = mock_page
-
-                mock_page.title.return_value = mock_title
-                mock_page.evaluate.return_value = mock_cleaned_html  # For get_cleaned_html
-
-                with patch(
-                    "deep_search_persist.deep_search_persist.local_ai.helper_call_llm_async", new_callable=AsyncMock
-                ) as mock_call_llm:
-                    mock_call_llm.return_value = mock_markdown_text
+    # Fake Playwright object tree with only the calls fetch_webpage_text_async makes
+    mock_page = SimpleNamespace(
+        goto=AsyncMock(),
+        title=AsyncMock(return_value=mock_title),
+        evaluate=AsyncMock(return_value=mock_cleaned_html),  # For get_cleaned_html
+    )
+    mock_context = SimpleNamespace(new_page=AsyncMock(return_value=mock_page))
+    mock_browser = SimpleNamespace(new_context=AsyncMock(return_value=mock_context), close=AsyncMock())
+    mock_playwright = SimpleNamespace(chromium=SimpleNamespace(launch=AsyncMock(return_value=mock_browser)))
+    async_cm.__aenter__.return_value = mock_playwright
+
+    with patch.object(app_config, "use_jina", False), patch.object(
+        app_config, "use_embed_browser", True
+    ), patch.object(app_config, "browse_lite", 0), patch.object(
+        local_ai, "async_playwright", MagicMock(return_value=async_cm)
+    ), patch.object(
+        local_ai, "call_llm_async", new_callable=AsyncMock
+    ) as mock_call_llm:
+        mock_call_llm.return_value = mock_markdown_text
 
-                    result = await fetch_webpage_text_async(http_session, url)
-                    assert result == f"# {mock_title}\n{mock_markdown_text}"
-                    mock_page.goto.assert_called_once_with(url, timeout=30000)
-                    mock_page.evaluate.assert_called_once()
-                    mock_call_llm.assert_called_once()
-                    mock_browser.close.assert_called_once()
+        result = await fetch_webpage_text_async(http_session, url)
+        assert result == f"# {mock_title}\n{mock_markdown_text}"
+        mock_page.goto.assert_called_once_with(url, timeout=30000)
+        mock_page.evaluate.assert_called_once()
+        mock_call_llm.assert_called_once()
+        mock_browser.close.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_fetch_webpage_text_async_jina(http_session):
+async def test_fetch_webpage_text_async_jina(http_session, async_cm):
     """Test fetch_webpage_text_async with Jina."""
     url = "http://example.com/jina"
     mock_jina_response = "Jina fetched content."
 
+    mock_resp = MagicMock()
+    mock_resp.status = 200
+    mock_resp.text = AsyncMock(return_value=mock_jina_response)
+    async_cm.__aenter__.return_value = mock_resp
+    http_session.get.return_value = async_cm
+
     with patch.object(app_config, 'use_jina', True):
-        with patch("aiohttp.ClientSession.get", new_callable=AsyncMock) as mock_get:
-            mock_resp = MagicMock()
-            mock_resp.status = 200
-            mock_resp.text.return_value = mock_jina_response
-            mock_get.return_value.__aenter__.return_value = mock_resp
-
-            result = await fetch_webpage_text_async(http_session, url)
-            assert result == mock_jina_response
-            mock_get.assert_called_once_with(
-                f"{app_config.jina_base_url}{url}", headers={"Authorization": f"Bearer {app_config.jina_api_key}"}
-            )
+        result = await fetch_webpage_text_async(http_session, url)
+        assert result == mock_jina_response
+        http_session.get.assert_called_once_with(
+            f"{app_config.jina_base_url}{url}", headers={"Authorization": f"Bearer {app_config.jina_api_key}"}
+        )
 
 
-@pytest.mark.asyncio
-async def test_is_page_useful_async(http_session: aiohttp.ClientSession):
+async def test_is_page_useful_async(http_session, monkeypatch):
     """Test is_page_useful_async."""
     user_message = Message(role="user", content="Is this page useful for my query?")
     messages = Messages([user_message])
     page_text = "This page contains useful information."
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async", new_callable=AsyncMock
-    ) as mock_call_llm:
-        mock_call_llm.return_value = "Yes"
-        usefulness = await is_page_useful_async(http_session, messages, page_text)
-        assert usefulness == "Yes"
-        mock_call_llm.assert_called_once()
+    mock_call_llm = AsyncMock(return_value="Yes")
+    monkeypatch.setattr(helper_functions, "call_llm_async", mock_call_llm)
+    usefulness = await is_page_useful_async(http_session, messages, page_text)
+    assert usefulness == "Yes"
+    mock_call_llm.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_extract_relevant_context_async(http_session):
+async def test_extract_relevant_context_async(http_session, monkeypatch):
     """Test extract_relevant_context_async."""
     user_message = Message(role="user", content="Extract context.")
     messages = Messages([user_message])
     search_query = "context extraction"
     page_text = "This is some text. Relevant context is here. Irrelevant text."
     page_url = "http://example.com/context"
-    mock_extracted_context = "Relevant context is here."
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async", new_callable=AsyncMock
-    ) as mock_call_llm:
-        mock_call_llm.return_value = mock_extracted_context
-        context = await extract_relevant_context_async(http_session, messages, search_query, page_text)
-        assert context == mock_extracted_context
-        mock_call_llm.assert_called_once()
+    mock_call_llm = AsyncMock(return_value=_EXTRACTED_CONTEXT)
+    monkeypatch.setattr(helper_functions, "call_llm_async", mock_call_llm)
+    context = await extract_relevant_context_async(http_session, messages, search_query, page_text)
+    assert context == _EXTRACTED_CONTEXT
+    mock_call_llm.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_get_new_search_queries_async(http_session):
+async def test_get_new_search_queries_async(http_session, monkeypatch):
     """Test get_new_search_queries_async with new centralized parsing."""
     user_message = Message(role="user", content="More queries needed?")
     messages = Messages([user_message])
     new_research_plan = "Continue research."
     previous_search_queries = ["old query"]
     all_contexts = ["old context"]
-    mock_new_queries = ["new query 1", "new query 2"]
-
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async_parse_list", new_callable=AsyncMock
-    ) as mock_call_llm_parse:
-        mock_call_llm_parse.return_value = mock_new_queries  # Returns parsed list directly
-        queries = await get_new_search_queries_async(
-            http_session, messages, new_research_plan, previous_search_queries, all_contexts
-        )
-        assert queries == mock_new_queries
-        mock_call_llm_parse.assert_called_once()
 
+    mock_call_llm_parse = AsyncMock(return_value=_NEW_SEARCH_QUERIES)  # Returns parsed list directly
+    monkeypatch.setattr(helper_functions, "call_llm_async_parse_list", mock_call_llm_parse)
+    queries = await get_new_search_queries_async(
+        http_session, messages, new_research_plan, previous_search_queries, all_contexts
+    )
+    assert queries == _NEW_SEARCH_QUERIES
+    mock_call_llm_parse.assert_called_once()
 
-@pytest.mark.asyncio
-async def test_get_new_search_queries_async_done_token(http_session):
+
+async def test_get_new_search_queries_async_done_token(http_session, monkeypatch):
     """Test get_new_search_queries_async returning <done> token."""
     user_message = Message(role="user", content="Research complete?")
     messages = Messages([user_message])
@@ -288,62 +321,50 @@ async def test_get_new_search_queries_async_done_token(http_session):
     previous_search_queries = ["old query"]
     all_contexts = ["comprehensive context"]
 
-    with patch(
-        "deep_search_persist.deep_search_persist.helper_functions.call_llm_async_parse_list", new_callable=AsyncMock
-    ) as mock_call_llm_parse:
-        mock_call_llm_parse.return_value = "<done>"  # Returns <done> token
-        result = await get_new_search_queries_async(
-            http_session, messages, new_research_plan, previous_search_queries, all_contexts
-        )
-        assert result == "<done>"
-        mock_call_llm_parse.assert_called_once()
+    mock_call_llm_parse = AsyncMock(return_value="<done>")  # Returns <done> token
+    monkeypatch.setattr(helper_functions, "call_llm_async_parse_list", mock_call_llm_parse)
+    result = await get_new_search_queries_async(
+        http_session, messages, new_research_plan, previous_search_queries, all_contexts
+    )
+    assert result == "<done>"
+    mock_call_llm_parse.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_process_link(http_session):
-    """Test process_link end-to-end flow."""
-    link = "http://example.com/process"
-    search_query = "process test"
-    user_message = Message(role="user", content="Process this link.")
-    messages = Messages([user_message])
+@pytest.fixture(scope="module")
+def _process_link_mocks() -> SimpleNamespace:
+    return SimpleNamespace(fetch=AsyncMock(), useful=AsyncMock(), extract=AsyncMock())
+
+
+@pytest.fixture
+def process_link_mocks(_process_link_mocks: SimpleNamespace) -> SimpleNamespace:
+    """Stand-ins for the three helpers process_link calls, reset for each test."""
+    for mock in vars(_process_link_mocks).values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    return _process_link_mocks
+
 
-    mock_page_text = "<html><body>Useful content.</body></html>"
-    mock_usefulness = "Yes"
-    mock_extracted_context = "Useful content."
-
-    with patch(
-        "deep_search_persist.deep_search_persist.local_ai.fetch_webpage_text_async", new_callable=AsyncMock
-    ) as mock_fetch_webpage:
-        mock_fetch_webpage.return_value = mock_page_text
-        with patch(
-            "deep_search_persist.deep_search_persist.helper_functions.is_page_useful_async", new_callable=AsyncMock
-        ) as mock_is_useful:
-            mock_is_useful.return_value = mock_usefulness
-            with patch(
-                "deep_search_persist.deep_search_persist.helper_functions.extract_relevant_context_async",
-                new_callable=AsyncMock,
-            ) as mock_extract_context:
-                mock_extract_context.return_value = mock_extracted_context
-
-                chunks = []
-                async for chunk in process_link(http_session, link, messages, search_query):
-                    chunks.append(chunk)
-
-                # Check for status messages and final context
-                assert any(f"Fetching content from: {link}" in c for c in chunks)
-                assert any(f"Page usefulness for {link}: {mock_usefulness}" in c for c in chunks)
-                assert f"url:{link}\ncontext:{mock_extracted_context}" in chunks
-
-                mock_fetch_webpage.assert_called_once_with(http_session, link)
-                mock_is_useful.assert_called_once()
-                mock_extract_context.assert_called_once()
-
-
-# Helper for AsyncMock and AsyncGeneratorMock
-class AsyncGeneratorMock:
-    def __init__(self, iterable):
-        self.iterable = iterable
-
-    async def __aiter__(self):
-        for item in self.iterable:
-            yield item
+async def test_process_link(http_session, process_link_mocks, monkeypatch):
+    """Test process_link end-to-end flow."""
+    messages = Messages([Message(role="user", content="Process this link.")])
+
+    process_link_mocks.fetch.return_value = _LINK_PAGE_TEXT
+    process_link_mocks.useful.return_value = _LINK_USEFULNESS
+    process_link_mocks.extract.return_value = _LINK_CONTEXT
+    monkeypatch.setattr(helper_functions, "fetch_webpage_text_async", process_link_mocks.fetch)
+    monkeypatch.setattr(helper_functions, "is_page_useful_async", process_link_mocks.useful)
+    monkeypatch.setattr(helper_functions, "extract_relevant_context_async", process_link_mocks.extract)
+
+    # Status messages are only streamed when a chunk factory is supplied, as the API does
+    chunks = [
+        chunk async for chunk in process_link(http_session, _LINK, messages, _LINK_QUERY, create_chunk=lambda msg: msg)
+    ]
+
+    # Check for status messages and final context
+    streamed = "".join(chunks)
+    assert f"Fetching content from: {_LINK}" in streamed
+    assert f"Page usefulness for {_LINK}: {_LINK_USEFULNESS}" in streamed
+    assert f"url:{_LINK}\ncontext:{_LINK_CONTEXT}" in chunks
+
+    process_link_mocks.fetch.assert_called_once_with(http_session, _LINK)
+    process_link_mocks.useful.assert_called_once()
+    process_link_mocks.extract.assert_called_once()
@@ -177,7 +177,7 @@ def test_app_config_uses_defaults_for_missing_toml_keys(mock_open_file, mock_pat
 @patch.dict(os.environ, {"OLLAMA_BASE_URL": "http://env-ollama:11434"}) # Corrected ENV VAR NAME
 @patch("deep_search_persist.deep_search_persist.configuration.Path.exists")
 @patch("deep_search_persist.deep_search_persist.configuration.open", new_callable=mock_open, read_data=MOCK_TOML_CONTENT) # MOCK_TOML_CONTENT has ollama_base_url in [LocalAI]
-def test_app_config_overrides_toml_with_env_var(mock_open_file, mock_path_exists, _mock_env_dict_unused): # _mock_env_dict_unused from @patch.dict
+def test_app_config_overrides_toml_with_env_var(mock_open_file, mock_path_exists):  # @patch.dict injects no argument
     """Test AppConfig prioritizes environment variables over TOML values."""
     mock_config_path = Path("/fake/path/research.toml")
     mock_path_exists.return_value = True # Simulate TOML file exists
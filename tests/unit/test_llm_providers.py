@@ -13,6 +13,20 @@ from deep_search_persist.deep_search_persist.llm_providers import (
 )
 from deep_search_persist.deep_search_persist.helper_classes import Message, Messages
 
+# Streamed Ollama chat chunks and the text pieces they carry
+_CHAT_CHUNKS = (
+    {"message": {"content": "Hello"}},
+    {"message": {"content": " world"}},
+    {"message": {"content": "!"}},
+)
+_CHAT_PIECES = ["Hello", " world", "!"]
+
+
+async def _aiter(items):
+    """Async iterator over ``items``, standing in for a streamed response."""
+    for item in items:
+        yield item
+
 
 class TestLLMProviderBaseParsing:
     """Test the base LLM provider parsing methods."""
@@ -187,37 +201,22 @@ class TestOllamaProvider:
         messages = Messages([Message(role="user", content="Hello")])
         
         # Mock the Ollama client
-        mock_response = [
-            {"message": {"content": "Hello"}},
-            {"message": {"content": " world"}},
-            {"message": {"content": "!"}}
-        ]
-        
         with patch.object(self.provider.client, 'chat', new_callable=AsyncMock) as mock_chat:
-            async def mock_chat_generator():
-                for response in mock_response:
-                    yield response
-            
-            mock_chat.return_value = mock_chat_generator()
+            mock_chat.return_value = _aiter(_CHAT_CHUNKS)
             
             result = []
             async for chunk in self.provider.generate_stream(messages, "test-model"):
                 result.append(chunk)
             
-            assert result == ["Hello", " world", "!"]
+            assert result == _CHAT_PIECES
 
     @pytest.mark.asyncio
     async def test_generate_complete(self):
         """Test complete generation by collecting stream."""
         messages = Messages([Message(role="user", content="Hello")])
         
-        # Mock the generate_stream method
-        async def mock_stream():
-            yield "Hello"
-            yield " world"
-            yield "!"
-        
-        self.provider.generate_stream = AsyncMock(return_value=mock_stream())
+        # Mock the generate_stream method; it is an async generator, so calling it is not awaited
+        self.provider.generate_stream = MagicMock(return_value=_aiter(_CHAT_PIECES))
         
         result = await self.provider.generate(messages, "test-model")
         assert result == "Hello world!"
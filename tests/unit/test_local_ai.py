@@ -2,215 +2,352 @@
 Unit tests for local_ai module functions.
 Tests the new call_llm_async_parse_list function and routing logic.
 """
+from types import SimpleNamespace
+
+import aiohttp
+import anyio
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from deep_search_persist.deep_search_persist import local_ai
+from deep_search_persist.deep_search_persist.configuration import app_config
 from deep_search_persist.deep_search_persist.local_ai import (
     call_llm_async,
     call_llm_async_parse_list,
+    call_openrouter_async,
+    get_domain,
+    is_pdf_url,
+)
+from deep_search_persist.deep_search_persist.llm_providers import (
+    LLMProviderFactory,
+    LMStudioProvider,
+    OllamaProvider,
+    OpenAICompatibleProvider,
 )
 from deep_search_persist.deep_search_persist.helper_classes import Message, Messages
 
 
+# (url, expected) cases for the URL helpers
+_PDF_URLS = (
+    ("https://example.com/paper.pdf", True),
+    ("https://example.com/PAPER.PDF", True),
+    ("https://example.com/paper.pdf?download=1", True),
+    ("https://example.com/article.html", False),
+    ("https://example.com/pdf", False),
+)
+_DOMAIN_URLS = (
+    ("https://Example.COM/path", "example.com"),
+    ("http://user:pw@sub.example.com:8080/x", "sub.example.com"),
+    ("mailto:someone@example.com", ""),
+    ("/relative/path", ""),
+)
+
+
+class _AnyioStub:
+    """Replacement for local_ai's ``anyio`` binding: overrides the given attributes, defers the rest to anyio."""
+
+    def __init__(self, **overrides):
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(anyio, name)
+
+
+@pytest.fixture(autouse=True)
+def _fast_waits(monkeypatch):
+    """Disable OpenRouter rate limiting and real sleeps in local_ai for each test."""
+    monkeypatch.setattr(local_ai, "OPERATION_WAIT_TIME", 0)
+    monkeypatch.setattr(app_config, "request_per_minute", 0)
+    monkeypatch.setattr(local_ai, "anyio", _AnyioStub(sleep=AsyncMock()))
+
+
+@pytest.fixture(scope="module")
+def _base_session():
+    return MagicMock(spec_set=aiohttp.ClientSession)
+
+
+@pytest.fixture
+def http_session(_base_session):
+    """Mock HTTP session, shared across the module and reset for each test."""
+    _base_session.reset_mock(return_value=True, side_effect=True)
+    return _base_session
+
+
+class _FakeResp:
+    """Minimal aiohttp response that is also its own ``async with`` context manager."""
+
+    def __init__(self, status, payload=None):
+        self.status = status
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def text(self):
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _completion(content):
+    """Chat completion payload whose first choice carries ``content``."""
+    return {"choices": [{"message": {"content": content}}]}
+
+
+class _VirtualClock:
+    """Stand-in for anyio's clock: sleeping advances virtual time instead of waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def current_time(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+    def jump(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def mock_clock(monkeypatch):
+    """Drive local_ai's anyio.current_time/anyio.sleep from a virtual clock for the duration of a test."""
+    clock = _VirtualClock()
+    monkeypatch.setattr(local_ai, "anyio", _AnyioStub(current_time=clock.current_time, sleep=clock.sleep))
+    return clock
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Patch every LLMProviderFactory accessor once per test, routing to Ollama by default.
+
+    Tests switch backends by setting ``app_config.llm_provider`` and configure the
+    matching provider mock (``providers.ollama``, ``providers.openai`` or ``providers.lmstudio``).
+    """
+    monkeypatch.setattr(app_config, "llm_provider", "ollama")
+    mocks = SimpleNamespace(
+        ollama=MagicMock(spec_set=OllamaProvider),
+        openai=MagicMock(spec_set=OpenAICompatibleProvider),
+        lmstudio=MagicMock(spec_set=LMStudioProvider),
+    )
+    with patch.multiple(
+        LLMProviderFactory,
+        get_ollama_provider=MagicMock(return_value=mocks.ollama),
+        get_openai_provider=MagicMock(return_value=mocks.openai),
+        get_lmstudio_provider=MagicMock(return_value=mocks.lmstudio),
+    ):
+        yield mocks
+
+
 class TestCallLLMAsyncParseList:
     """Test the new call_llm_async_parse_list function."""
 
-    @pytest.fixture
-    async def http_session(self):
-        """Mock HTTP session."""
-        return AsyncMock()
-
     @pytest.fixture
     def messages(self):
         """Test messages."""
         return Messages([Message(role="user", content="Generate search queries")])
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_ollama_success(self, http_session, messages):
+    async def test_call_llm_async_parse_list_ollama_success(self, http_session, messages, providers):
         """Test successful parsing with Ollama provider."""
         expected_queries = ["query1", "query2", "query3"]
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", True):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.return_value = expected_queries
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == expected_queries
-                mock_provider.generate_and_parse_list.assert_called_once_with(
-                    messages, "test-model", 20000, 4000
-                )
+        providers.ollama.generate_and_parse_list.return_value = expected_queries
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000)
+
+        assert result == expected_queries
+        providers.ollama.generate_and_parse_list.assert_called_once_with(
+            messages, "test-model", 20000, 4000, session=http_session
+        )
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_openai_success(self, http_session, messages):
+    async def test_call_llm_async_parse_list_openai_success(self, monkeypatch, http_session, messages, providers):
         """Test successful parsing with OpenAI-compatible provider."""
         expected_queries = ["query1", "query2"]
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", False):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_openai_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.return_value = expected_queries
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == expected_queries
-                mock_provider.generate_and_parse_list.assert_called_once_with(
-                    messages, "test-model", 20000, 4000, session=http_session
-                )
+        monkeypatch.setattr(app_config, "llm_provider", "openai_compatible")
+        providers.openai.generate_and_parse_list.return_value = expected_queries
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000)
+
+        assert result == expected_queries
+        providers.openai.generate_and_parse_list.assert_called_once_with(
+            messages, "test-model", 20000, 4000, session=http_session
+        )
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_done_token(self, http_session, messages):
+    async def test_call_llm_async_parse_list_done_token(self, http_session, messages, providers):
         """Test parsing returning <done> token."""
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", True):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.return_value = "<done>"
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == "<done>"
+        providers.ollama.generate_and_parse_list.return_value = "<done>"
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000)
+
+        assert result == "<done>"
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_force_ollama(self, http_session, messages):
+    async def test_call_llm_async_parse_list_force_ollama(self, monkeypatch, http_session, messages, providers):
         """Test forcing Ollama provider regardless of configuration."""
         expected_queries = ["forced_query"]
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", False):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.return_value = expected_queries
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000, force_ollama=True
-                )
-                
-                assert result == expected_queries
-                mock_provider.generate_and_parse_list.assert_called_once()
+        monkeypatch.setattr(app_config, "llm_provider", "openai_compatible")
+        providers.ollama.generate_and_parse_list.return_value = expected_queries
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000, force_ollama=True)
+
+        assert result == expected_queries
+        providers.ollama.generate_and_parse_list.assert_called_once()
+        providers.openai.generate_and_parse_list.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_max_tokens_override(self, http_session, messages):
+    async def test_call_llm_async_parse_list_max_tokens_override(self, http_session, messages, providers):
         """Test max_tokens override parameter."""
         custom_max_tokens = 5000
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", True):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.return_value = []
-                mock_factory.return_value = mock_provider
-                
-                await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000, 
-                    max_tokens_override=custom_max_tokens
-                )
-                
-                mock_provider.generate_and_parse_list.assert_called_once_with(
-                    messages, "test-model", custom_max_tokens, 4000
-                )
+        providers.ollama.generate_and_parse_list.return_value = []
+
+        await call_llm_async_parse_list(
+            http_session, messages, "test-model", 4000, max_tokens_override=custom_max_tokens
+        )
+
+        providers.ollama.generate_and_parse_list.assert_called_once_with(
+            messages, "test-model", custom_max_tokens, 4000, session=http_session
+        )
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_exception_handling(self, http_session, messages):
+    async def test_call_llm_async_parse_list_exception_handling(self, http_session, messages, providers):
         """Test exception handling returns empty list."""
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", True):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate_and_parse_list.side_effect = Exception("Test error")
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async_parse_list(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == []
+        providers.ollama.generate_and_parse_list.side_effect = Exception("Test error")
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000)
+
+        assert result == []
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_parse_list_routing_error(self, http_session, messages):
+    async def test_call_llm_async_parse_list_routing_error(self, monkeypatch, http_session, messages, providers):
         """Test routing configuration error."""
         # Set invalid configuration state
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", False):
-            result = await call_llm_async_parse_list(
-                http_session, messages, "test-model", 4000, force_ollama=False
-            )
-            
-            # Should return empty list when routing fails
-            assert result == []
+        monkeypatch.setattr(app_config, "llm_provider", "unknown")
+
+        result = await call_llm_async_parse_list(http_session, messages, "test-model", 4000, force_ollama=False)
+
+        # Should return empty list when routing fails
+        assert result == []
 
 
 class TestCallLLMAsyncCompatibility:
     """Test that the original call_llm_async still works correctly."""
 
-    @pytest.fixture
-    async def http_session(self):
-        """Mock HTTP session."""
-        return AsyncMock()
-
     @pytest.fixture
     def messages(self):
         """Test messages."""
         return Messages([Message(role="user", content="Hello world")])
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_ollama_unchanged(self, http_session, messages):
+    async def test_call_llm_async_ollama_unchanged(self, http_session, messages, providers):
         """Test that original call_llm_async function works unchanged."""
         expected_response = "Hello! How can I help you today?"
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", True):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_ollama_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate.return_value = expected_response
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == expected_response
-                mock_provider.generate.assert_called_once_with(
-                    messages, "test-model", 20000, 4000
-                )
+        providers.ollama.generate.return_value = expected_response
+
+        result = await call_llm_async(http_session, messages, "test-model", 4000)
+
+        assert result == expected_response
+        providers.ollama.generate.assert_called_once_with(messages, "test-model", 20000, 4000)
 
     @pytest.mark.asyncio
-    async def test_call_llm_async_openai_unchanged(self, http_session, messages):
+    async def test_call_llm_async_openai_unchanged(self, monkeypatch, http_session, messages, providers):
         """Test that original call_llm_async works with OpenAI provider."""
         expected_response = "OpenAI response"
-        
-        with patch("deep_search_persist.deep_search_persist.configuration.USE_OLLAMA", False):
-            with patch(
-                "deep_search_persist.deep_search_persist.local_ai.LLMProviderFactory.get_openai_provider"
-            ) as mock_factory:
-                mock_provider = AsyncMock()
-                mock_provider.generate.return_value = expected_response
-                mock_factory.return_value = mock_provider
-                
-                result = await call_llm_async(
-                    http_session, messages, "test-model", 4000
-                )
-                
-                assert result == expected_response
-                mock_provider.generate.assert_called_once_with(
-                    messages, "test-model", 20000, 4000, session=http_session
-                )
\ No newline at end of file
+        monkeypatch.setattr(app_config, "llm_provider", "openai_compatible")
+        providers.openai.generate.return_value = expected_response
+
+        result = await call_llm_async(http_session, messages, "test-model", 4000)
+
+        assert result == expected_response
+        providers.openai.generate.assert_called_once_with(
+            messages, "test-model", 20000, 4000, session=http_session
+        )
+
+
+class TestOpenRouter:
+    """Test call_openrouter_async request handling and rate limiting."""
+
+    @pytest.fixture(autouse=True)
+    def _empty_request_window(self, monkeypatch):
+        """Start each test with no recorded OpenRouter requests."""
+        monkeypatch.setattr(local_ai, "openrouter_last_request_times", [])
+
+    @pytest.fixture
+    def one_request_per_minute(self, monkeypatch):
+        """Re-enable rate limiting at one request per minute."""
+        monkeypatch.setattr(app_config, "request_per_minute", 1)
+
+    @pytest.fixture
+    def messages(self):
+        """Test messages."""
+        return Messages([Message(role="user", content="Hello")])
+
+    @pytest.fixture
+    def mock_session(self, http_session):
+        """Session whose post() always answers with a 200 'Test' completion."""
+        http_session.post.return_value = _FakeResp(200, _completion("Test"))
+        return http_session
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "responses, expected",
+        [
+            ([_FakeResp(200, _completion("Test"))], "Test"),
+            ([_FakeResp(200, _completion("")), _FakeResp(200, _completion("Fallback"))], "Fallback"),
+            ([_FakeResp(429, "rate limit exceeded"), _FakeResp(200, _completion("Fallback"))], "Fallback"),
+            ([Exception("Network error")], None),
+        ],
+        ids=["success", "empty-response-fallback", "api-error-fallback", "exception"],
+    )
+    async def test_call_openrouter_responses(self, monkeypatch, http_session, messages, responses, expected):
+        """Test the direct, fallback and failure outcomes of call_openrouter_async."""
+        monkeypatch.setattr(app_config, "fallback_model_config", "fallback-model")
+        http_session.post.side_effect = responses
+
+        result = await call_openrouter_async(http_session, messages)
+
+        assert result == expected
+        assert http_session.post.call_count == len(responses)
+        if len(responses) > 1:
+            assert http_session.post.call_args.kwargs["json"]["model"] == "fallback-model"
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("one_request_per_minute")
+    async def test_call_openrouter_rate_limit(self, mock_session, messages, mock_clock):
+        """Test a second request inside the window waits until the window has passed."""
+        assert await call_openrouter_async(mock_session, messages) == "Test"
+        assert await call_openrouter_async(mock_session, messages) == "Test"
+
+        assert mock_clock.now == 60
+        assert mock_session.post.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("one_request_per_minute")
+    async def test_call_openrouter_rate_limit_window_expired(self, mock_session, messages, mock_clock):
+        """Test no wait is added once the previous request has left the window."""
+        await call_openrouter_async(mock_session, messages)
+        mock_clock.jump(61)
+        await call_openrouter_async(mock_session, messages)
+
+        assert mock_clock.now == 61
+        assert mock_session.post.call_count == 2
+
+
+class TestUrlHelpers:
+    """Test the is_pdf_url and get_domain URL helpers."""
+
+    @pytest.mark.parametrize("url, expected", _PDF_URLS, ids=[url for url, _ in _PDF_URLS])
+    def test_is_pdf_url(self, url, expected):
+        """Test PDF detection from the URL path."""
+        assert is_pdf_url(url) is expected
+
+    @pytest.mark.parametrize("url, expected", _DOMAIN_URLS, ids=[url for url, _ in _DOMAIN_URLS])
+    def test_get_domain(self, url, expected):
+        """Test hostname extraction, including URLs without one."""
+        assert get_domain(url) == expected
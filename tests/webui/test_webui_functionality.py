@@ -16,8 +16,9 @@ from deep_search_persist.simple_webui.utils.color_accessibility import (
     simulate_tritanopia
 )
 from deep_search_persist.simple_webui.utils.color_convert import (
-    hex_to_rgb, rgb_to_hex, rgb_to_hsl, hsl_to_rgb, get_relative_luminance
+    hex_to_rgb, rgb_to_hex, rgb_to_hsl, hsl_to_rgb, hsl_to_hex, get_relative_luminance
 )
+from deep_search_persist.simple_webui.utils import color_schemes
 from deep_search_persist.simple_webui.utils.color_schemes import (
     COLOR_SCHEMES, ColorPalette
 )
@@ -149,6 +150,25 @@ class TestWebUIColorFunctionality:
         assert abs(rgb_back[1] - 0) < 2
         assert abs(rgb_back[2] - 0) < 2
 
+    def test_hsl_to_hex_matches_two_step_conversion(self):
+        """Test fused HSL to hex conversion against hsl_to_rgb + rgb_to_hex."""
+        for h, s, l in [(0, 1, 0.5), (137.5, 0.6, 0.4), (200, 0, 0.5), (359.9, 0.9, 0.85), (480, 0.3, 0.15)]:
+            assert hsl_to_hex(h, s, l) == rgb_to_hex(hsl_to_rgb(h, s, l))
+
+    @pytest.mark.parametrize("method", ["generate_qualitative_colors", "generate_sequential_colors"])
+    @pytest.mark.parametrize("base_hue", ["#8B4513", "#1E90FF", "#808080"])
+    def test_numba_palette_matches_pure_python(self, method, base_hue, monkeypatch):
+        """Test the compiled palette kernel used at NUMBA_MIN_COUNT colors against the pure-Python loops."""
+        pytest.importorskip("numba")
+        palette = ColorPalette("Test", "Kernel parity", base_hue)
+        count = color_schemes.NUMBA_MIN_COUNT + 8
+
+        assert color_schemes._load_palette_kernel() is not None
+        compiled = getattr(palette, method)(count)
+
+        monkeypatch.setattr(color_schemes, "_load_palette_kernel", lambda: None)
+        assert getattr(palette, method)(count) == compiled
+
 
 @pytest.mark.webui
 @pytest.mark.integration